@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+class PromptUsage(SQLModel, table=True):
+    __tablename__ = "prompt_usage"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    feature: str = Field(index=True)
+    model: str
+    estimated_prompt_tokens: Optional[int] = Field(default=None)
+    prompt_tokens: Optional[int] = Field(default=None)
+    cached_prompt_tokens: Optional[int] = Field(default=None)
+    completion_tokens: Optional[int] = Field(default=None)
+    latency_ms: float
+    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
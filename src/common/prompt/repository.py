@@ -0,0 +1,7 @@
+from common.prompt.models import PromptUsage
+from common.repository.base import BaseRepository
+
+
+class PromptUsageRepository(BaseRepository):
+    def __init__(self):
+        super().__init__(PromptUsage)
@@ -0,0 +1,57 @@
+import logging
+import time
+
+from common.prompt.repository import PromptUsageRepository
+
+logger = logging.getLogger(__name__)
+usage_repository = PromptUsageRepository()
+
+
+def _record_usage(feature, model, estimated_tokens, response, latency_ms):
+    """Stores token usage and latency of one call; never fails the call itself."""
+    usage = getattr(response, "usage", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    try:
+        usage_repository.create(
+            feature=feature,
+            model=model,
+            estimated_prompt_tokens=estimated_tokens,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            cached_prompt_tokens=getattr(details, "cached_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            latency_ms=latency_ms,
+        )
+    except Exception:
+        logger.warning("Could not record prompt usage", exc_info=True)
+
+
+def complete_chat(
+    client, template, model, feature, budget=None, temperature=None, **variables
+):
+    """
+    Renders the template within its token budget, sends it to the
+    chat-completions API and records usage and latency for `feature`.
+    Returns the API response.
+    """
+    messages, estimated_tokens = template.render(budget, **variables)
+    options = {} if temperature is None else {"temperature": temperature}
+    started = time.perf_counter()
+    response = client.chat.completions.create(model=model, messages=messages, **options)
+    latency_ms = (time.perf_counter() - started) * 1000
+    _record_usage(feature, model, estimated_tokens, response, latency_ms)
+    return response
+
+
+async def acomplete_chat(
+    client, template, model, feature, budget=None, temperature=None, **variables
+):
+    """Async variant of complete_chat for an AsyncOpenAI client."""
+    messages, estimated_tokens = template.render(budget, **variables)
+    options = {} if temperature is None else {"temperature": temperature}
+    started = time.perf_counter()
+    response = await client.chat.completions.create(
+        model=model, messages=messages, **options
+    )
+    latency_ms = (time.perf_counter() - started) * 1000
+    _record_usage(feature, model, estimated_tokens, response, latency_ms)
+    return response
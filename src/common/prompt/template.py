@@ -0,0 +1,135 @@
+import math
+import os
+import re
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to the local estimate below
+    tiktoken = None
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "6000"))
+TRUNCATION_MARKER = " …[truncated]"
+
+# Latin words/numbers, single CJK/Hangul characters, or single other symbols.
+_PIECE_PATTERN = re.compile(
+    r"[A-Za-z0-9_]+"
+    r"|[\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u4e00-\u9fff\uac00-\ud7af]"
+    r"|\S"
+)
+_encoding = None
+
+
+def _get_encoding():
+    """tiktoken's encoding, or None if tiktoken is missing or can't load it."""
+    global _encoding, tiktoken
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            # The first load downloads the encoding file, which fails offline;
+            # use the estimate from now on instead of retrying on every call.
+            tiktoken = None
+    return _encoding
+
+
+def _piece_tokens(piece):
+    # Roughly four Latin characters per token; everything else one token each.
+    if piece[0].isascii() and piece[0].isalnum():
+        return math.ceil(len(piece) / 4)
+    return 1
+
+
+def count_tokens(text):
+    """
+    Counts tokens locally: exactly with tiktoken if it is installed and its
+    encoding loads, otherwise with a conservative estimate that needs no
+    dependencies.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return sum(_piece_tokens(m.group()) for m in _PIECE_PATTERN.finditer(text))
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Keeps the beginning of the text so that it fits in max_tokens."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    max_tokens = max(max_tokens - count_tokens(TRUNCATION_MARKER), 0)
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:max_tokens]) + TRUNCATION_MARKER
+    used, end = 0, 0
+    for match in _PIECE_PATTERN.finditer(text):
+        tokens = _piece_tokens(match.group())
+        if used + tokens > max_tokens:
+            # Cut inside an over-long word rather than dropping it whole.
+            end = match.start() + (max_tokens - used) * 4 if tokens > 1 else end
+            break
+        used += tokens
+        end = match.end()
+    return text[:end] + TRUNCATION_MARKER
+
+
+def fit_to_budget(values, budget):
+    """
+    Truncates the values of a {name: text} dict so that together they fit
+    in `budget` tokens. Short values are kept whole; the remaining budget is
+    split evenly among the long ones.
+    """
+    sizes = {name: count_tokens(str(value)) for name, value in values.items()}
+    if sum(sizes.values()) <= budget:
+        return dict(values)
+    fitted = {}
+    remaining_budget = max(budget, 0)
+    remaining = sorted(values, key=lambda name: sizes[name])
+    while remaining:
+        share = remaining_budget // len(remaining)
+        name = remaining.pop(0)
+        if sizes[name] <= share:
+            fitted[name] = values[name]
+            remaining_budget -= sizes[name]
+        else:
+            fitted[name] = truncate_to_tokens(str(values[name]), share)
+            remaining_budget -= share
+    return fitted
+
+
+class PromptTemplate:
+    """
+    A chat prompt split into a static prefix and a variable part.
+
+    `instructions` never changes between calls and is always sent first as
+    the system message, so providers with prefix caching can reuse it.
+    `variables_template` is a str.format template for the user message that
+    holds everything call-specific; its fields are truncated to fit the
+    token budget before it is filled in.
+    """
+
+    def __init__(self, instructions, variables_template, budget=DEFAULT_TOKEN_BUDGET):
+        self.instructions = instructions.strip()
+        self.variables_template = variables_template.strip()
+        self.budget = budget
+        self._fixed_tokens = count_tokens(self.instructions) + count_tokens(
+            self.variables_template
+        )
+
+    def render(self, budget=None, **variables):
+        """Returns (messages, estimated_prompt_tokens)."""
+        budget = budget or self.budget
+        fitted = fit_to_budget(
+            {
+                name: "" if value is None else str(value)
+                for name, value in variables.items()
+            },
+            budget - self._fixed_tokens,
+        )
+        user_message = self.variables_template.format(**fitted)
+        messages = [
+            {"role": "system", "content": self.instructions},
+            {"role": "user", "content": user_message},
+        ]
+        estimated_tokens = count_tokens(self.instructions) + count_tokens(user_message)
+        return messages, estimated_tokens
@@ -1,10 +1,11 @@
-from sqlmodel import Session, select
-from database import engine
+from sqlmodel import Session, and_, or_, select
+from database import engine, sync_table
 
 
 class BaseRepository:
     def __init__(self, model):
         self.model = model
+        sync_table(model.__table__)
 
     def get(self, id: int):
         with Session(engine) as session:
@@ -33,3 +34,17 @@ class BaseRepository:
                 session.commit()
                 session.refresh(obj)
             return obj
+
+    def _newest_first(self, statement, column, cursor=None):
+        """
+        Orders statement by (column, id), newest first. Given the (column
+        value, id) cursor of the previous page's last row, keeps only older
+        rows, so every page is a range scan on the column's index instead
+        of an OFFSET.
+        """
+        if cursor is not None:
+            value, row_id = cursor
+            statement = statement.where(
+                or_(column < value, and_(column == value, self.model.id < row_id))
+            )
+        return statement.order_by(column.desc(), self.model.id.desc())
@@ -0,0 +1,38 @@
+"""
+Line-level helpers shared by the import/export features, which stream
+files line by line instead of loading them whole.
+"""
+
+import csv
+import io
+import tempfile
+
+
+class _LineBuffer:
+    """Minimal file-like object so csv.writer can feed a generator."""
+
+    def write(self, value):
+        self.value = value
+
+
+def csv_lines(rows, **fmtparams):
+    """Yields each row as one formatted CSV line (fmtparams as for csv.writer)."""
+    buffer = _LineBuffer()
+    writer = csv.writer(buffer, **fmtparams)
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.value
+
+
+def upload_lines(uploaded_file):
+    """Reads an uploaded binary file as UTF-8 text lines, without loading it."""
+    return io.TextIOWrapper(uploaded_file, encoding="utf-8", newline="")
+
+
+def spool_lines(lines):
+    """Writes text lines to a temporary file and returns it, rewound."""
+    export_file = tempfile.TemporaryFile("w+b")
+    for line in lines:
+        export_file.write(line.encode("utf-8"))
+    export_file.seek(0)
+    return export_file
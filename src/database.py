@@ -1,3 +1,4 @@
+from sqlalchemy import inspect
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import create_engine, SQLModel
 
@@ -6,6 +7,7 @@ from sqlmodel import create_engine, SQLModel
 
 DB_FILE = "playground.db"
 _engine = None
+_synced_tables = set()
 
 
 def get_engine():
@@ -18,5 +20,38 @@ def get_engine():
     return _engine
 
 
+def sync_table(table):
+    """
+    Brings one table in line with its model, once per process: creates the
+    table if it doesn't exist, then adds any columns and indexes that were
+    added to the model after the table was created. Only nullable columns
+    can be added this way (SQLite restriction); nothing is ever dropped.
+    """
+    if table.name in _synced_tables:
+        return
+    engine = get_engine()
+    table.create(engine, checkfirst=True)
+    inspector = inspect(engine)
+    existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+    with engine.begin() as connection:
+        # Read names from sqlite_master: the inspector skips expression indexes.
+        existing_indexes = set(
+            connection.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?",
+                (table.name,),
+            ).scalars()
+        )
+        for column in table.columns:
+            if column.name not in existing_columns:
+                column_type = column.type.compile(engine.dialect)
+                connection.exec_driver_sql(
+                    f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+                )
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(connection)
+    _synced_tables.add(table.name)
+
+
 engine = get_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
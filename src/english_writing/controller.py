@@ -1,8 +1,16 @@
 import random
 from typing import Optional
 
+from common.transfer.lines import upload_lines
+
+from . import importer
+from .precheck import AnswerPrecheck, normalize_answer
+
 from .repository import MemoRepository, FeedbackRepository
-from .service import QuestionService, FeedbackService
+from .service import QuestionService, FeedbackService, parse_score
+
+FEEDBACK_PAGE_SIZE = 10
+QUESTION_BATCH_SIZE = 5
 
 
 class AppController:
@@ -15,18 +23,53 @@ class AppController:
         self.feedback_service = feedback_service
         self.memo_repository = MemoRepository()
         self.feedback_repository = FeedbackRepository()
+        self.precheck = AnswerPrecheck()
+        self._question = None
         self._questions = []
         self._memos = []
 
     def get_question(self) -> dict | None:
+        if self._question is None:
+            return self.next_question()
+        return self._question
+
+    def next_question(self) -> dict | None:
+        """
+        Moves on to the next question of the session's batch, drawing a new
+        batch of distinct, weighted questions when it runs out.
+        """
         if not self._questions:
-            loaded_questions = self.question_service.load_questions()
-            if loaded_questions:
-                self._questions = random.choice(loaded_questions)
-            else:
-                self._questions = None
+            exclude_ids = [self._question["id"]] if self._question else []
+            self._questions = self.question_service.draw_questions(
+                QUESTION_BATCH_SIZE, exclude_ids=exclude_ids
+            )
+        if self._questions:
+            self._question = self._questions.pop(0)
+        return self._question
+
+    def get_feedback_page(self, cursor=None, question_id=None):
+        """
+        Returns (feedback rows, next cursor) for one page of history, newest first.
+        """
+        return self.feedback_repository.get_page(
+            FEEDBACK_PAGE_SIZE, cursor=cursor, question_id=question_id
+        )
 
-        return self._questions
+    def count_feedback(self, question_id=None) -> int:
+        return self.feedback_repository.count(question_id)
+
+    def import_file(self, kind: str, uploaded_file) -> tuple[int, int]:
+        """
+        Streams an uploaded questions/memos file into the database.
+        Returns (inserted, skipped as duplicates).
+        """
+        lines = upload_lines(uploaded_file)
+        result = importer.import_file(
+            kind, lines, importer.format_from_name(uploaded_file.name)
+        )
+        if kind == "memos":
+            self._memos = []
+        return result
 
     def get_random_memo(self) -> str | None:
         if not self._memos:
@@ -36,26 +79,47 @@ class AppController:
             return random.choice(self._memos).memo
         return None
 
-    def process_answer_and_get_feedback(self, question: str, answer: str) -> str | None:
+    def get_question_progress(self, question_id: int) -> dict | None:
+        return self.question_service.get_progress(question_id)
+
+    def process_answer_and_get_feedback(
+        self, question: dict, answer: str
+    ) -> str | None:
         if not self.feedback_service:
             print("Error: FeedbackService is not configured.")
             return "Please configure the feedback service."
 
-        if not answer or not answer.strip():
+        if not normalize_answer(answer):
             return "Answer is empty. Please write an answer."
 
+        # An answer that is effectively unchanged gets its earlier feedback back.
+        previous = self.precheck.find_previous(question["id"], answer)
+        if previous:
+            note = (
+                "same as"
+                if previous["exact"]
+                else f"{previous['similarity']:.0%} similar to"
+            )
+            return (
+                f"_This answer is {note} one you submitted before, "
+                f"so here is the feedback you got then._\n\n{previous['feedback']}"
+            )
+
         try:
-            feedback = self.feedback_service.get_feedback(question, answer)
-            self._save_feedback(question, answer, feedback)
+            feedback = self.feedback_service.get_feedback(question["question"], answer)
+            if feedback is None:
+                # Nothing is saved, so a failed call doesn't count as an attempt.
+                return "Could not get feedback from OpenAI. Please try again."
+            self._save_feedback(question["id"], answer, feedback)
             return feedback
         except Exception as e:
             print(f"Error processing feedback in controller: {e}")
             return f"An error occurred while generating feedback: {e}"
 
-    def _save_feedback(self, question: str, answer: str, feedback: str):
+    def _save_feedback(self, question_id: int, answer: str, feedback: str):
         try:
-            self.feedback_repository.create(
-                question=question, answer=answer, feedback=feedback
+            self.feedback_repository.add(
+                question_id, answer, feedback, score=parse_score(feedback)
             )
         except Exception as e:
             print(f"Error saving feedback: {e}")
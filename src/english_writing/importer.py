@@ -0,0 +1,139 @@
+"""
+Bulk import of English Writing questions or memos from plain text (one per
+line), CSV or JSON Lines files, skipping texts that are already stored.
+
+    PYTHONPATH=src python -m english_writing.importer questions questions.txt
+    PYTHONPATH=src python -m english_writing.importer memos memos.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import re
+import sys
+import unicodedata
+from itertools import islice
+
+from english_writing.repository import MemoRepository, QuestionRepository
+
+IMPORT_BATCH_SIZE = 5000
+KINDS = {
+    "questions": ("question", QuestionRepository),
+    "memos": ("memo", MemoRepository),
+}
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """Unicode-normalizes, case-folds and collapses whitespace."""
+    text = unicodedata.normalize("NFKC", text)
+    return WHITESPACE_PATTERN.sub(" ", text).strip().casefold()
+
+
+def text_hash(text):
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def read_text(lines, field):
+    for line in lines:
+        yield line
+
+
+def read_csv(lines, field):
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    names = [name.strip().lower() for name in header]
+    if field in names or "text" in names:
+        column = names.index(field) if field in names else names.index("text")
+    else:
+        # No recognised header: the first row is data, the text is column 0.
+        column = 0
+        yield header[0] if header else ""
+    for row in reader:
+        if len(row) > column:
+            yield row[column]
+
+
+def read_jsonl(lines, field):
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {line_no}: {e}")
+        if isinstance(record, dict):
+            record = record.get(field) or record.get("text", "")
+        if not isinstance(record, str):
+            raise ValueError(
+                f"Line {line_no}: expected a string or an object with a "
+                f"'{field}' or 'text' string, got {type(record).__name__}"
+            )
+        yield record
+
+
+READERS = {"txt": read_text, "csv": read_csv, "jsonl": read_jsonl}
+
+
+def _rows(texts):
+    """Yields (text, hash) for non-empty texts; duplicates are left to the index."""
+    for text in texts:
+        text = (text or "").strip()
+        if text:
+            yield text, text_hash(text)
+
+
+def backfill_hashes(repository, batch_size=IMPORT_BATCH_SIZE):
+    """Hashes rows created before text_hash existed (or outside the importer)."""
+    last_id = 0
+    while rows := repository.get_unhashed(batch_size, last_id):
+        repository.set_hashes([(row_id, text_hash(text)) for row_id, text in rows])
+        last_id = rows[-1][0]
+
+
+def import_texts(kind, texts, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Inserts texts as questions or memos in batches of batch_size rows, one
+    transaction per batch. Returns (inserted, skipped as duplicates).
+    """
+    _, repository_class = KINDS[kind]
+    repository = repository_class()
+    backfill_hashes(repository, batch_size)
+
+    before = repository.count()
+    total = 0
+    rows = _rows(texts)
+    while batch := list(islice(rows, batch_size)):
+        repository.insert_many(batch)
+        total += len(batch)
+    inserted = repository.count() - before
+    return inserted, total - inserted
+
+
+def import_file(kind, lines, file_format):
+    """Imports an iterable of text lines in "txt", "csv" or "jsonl" format."""
+    field, _ = KINDS[kind]
+    return import_texts(kind, READERS[file_format](lines, field))
+
+
+def format_from_name(name):
+    extension = name.rsplit(".", 1)[-1].lower()
+    return extension if extension in READERS else "txt"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("kind", choices=list(KINDS))
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+
+    with open(args.path, "r", encoding="utf-8", newline="") as f:
+        inserted, skipped = import_file(args.kind, f, format_from_name(args.path))
+    print(f"Imported {inserted} {args.kind} from {args.path} ({skipped} duplicates)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
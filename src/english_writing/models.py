@@ -1,4 +1,4 @@
-from sqlmodel import Field, SQLModel
+from sqlmodel import Field, Index, SQLModel
 from datetime import datetime
 
 
@@ -6,20 +6,44 @@ class Question(SQLModel, table=True):
     __tablename__ = "english_writing_question"
     id: int | None = Field(default=None, primary_key=True)
     question: str
+    # Hash of the normalized text; the unique index deduplicates imports.
+    text_hash: str | None = Field(default=None, unique=True, index=True)
 
 
 class Memo(SQLModel, table=True):
     __tablename__ = "english_writing_memo"
     id: int | None = Field(default=None, primary_key=True)
     memo: str
+    text_hash: str | None = Field(default=None, unique=True, index=True)
 
 
 class Feedback(SQLModel, table=True):
     __tablename__ = "english_writing_feedback"
+    # Serves the per-question history page: filter on question_id, then
+    # walk timestamps in order without a sort step.
+    __table_args__ = (
+        Index(
+            "ix_english_writing_feedback_question_id_timestamp",
+            "question_id",
+            "timestamp",
+        ),
+    )
     id: int | None = Field(default=None, primary_key=True)
     question_id: int | None = Field(
         default=None, foreign_key="english_writing_question.id"
     )
     answer: str
     feedback: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
+class QuestionProgress(SQLModel, table=True):
+    """Per-question aggregate of feedback, updated on every saved answer."""
+
+    __tablename__ = "english_writing_question_progress"
+    question_id: int = Field(
+        primary_key=True, foreign_key="english_writing_question.id"
+    )
+    attempt_count: int = 0
+    last_attempt_at: datetime | None = Field(default=None, index=True)
+    last_score: int | None = None
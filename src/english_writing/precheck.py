@@ -0,0 +1,134 @@
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+
+from .repository import FeedbackRepository
+
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+def normalize_answer(answer: str) -> str:
+    """Unicode-normalizes, case-folds, drops punctuation and collapses whitespace."""
+    answer = unicodedata.normalize("NFKC", answer or "").casefold()
+    answer = PUNCTUATION_PATTERN.sub(" ", answer)
+    return WHITESPACE_PATTERN.sub(" ", answer).strip()
+
+
+def shingles(text: str, size: int = 5) -> np.ndarray:
+    """Hashes of the text's character shingles as 31-bit integers."""
+    if len(text) <= size:
+        pieces = {text}
+    else:
+        pieces = {text[i : i + size] for i in range(len(text) - size + 1)}
+    return np.fromiter(
+        (zlib.crc32(piece.encode("utf-8")) & MERSENNE_PRIME for piece in pieces),
+        dtype=np.uint64,
+        count=len(pieces),
+    )
+
+
+class MinHasher:
+    """MinHash signatures with a fixed, seeded set of hash permutations."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingles(text)
+        # a, b and the hashes are all below 2^31, so a * x + b fits in 64 bits.
+        permuted = (np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+
+class _QuestionIndex:
+    """LSH buckets and signatures of one question's stored answers."""
+
+    def __init__(self, bands: int):
+        self.bands = bands
+        self.buckets: dict[tuple, list[int]] = {}
+        self.signatures: dict[int, np.ndarray] = {}
+        self.normalized: dict[str, int] = {}
+        self.last_id = 0
+
+    def add(self, feedback_id: int, normalized: str, signature: np.ndarray):
+        self.normalized[normalized] = feedback_id
+        self.signatures[feedback_id] = signature
+        for band, rows in enumerate(np.split(signature, self.bands)):
+            self.buckets.setdefault((band, rows.tobytes()), []).append(feedback_id)
+        self.last_id = max(self.last_id, feedback_id)
+
+    def candidates(self, signature: np.ndarray) -> set[int]:
+        found = set()
+        for band, rows in enumerate(np.split(signature, self.bands)):
+            found.update(self.buckets.get((band, rows.tobytes()), ()))
+        return found
+
+
+class AnswerPrecheck:
+    """
+    Finds earlier answers to the same question that are effectively the
+    same as a new one, so their feedback can be reused without an API call.
+
+    Answers are compared after normalization: identical normalized text is
+    an exact match, otherwise MinHash signatures over character shingles are
+    bucketed with LSH and candidates above `threshold` estimated Jaccard
+    similarity count as near-duplicates. Each question's index is built
+    lazily from the stored feedback and then kept up to date incrementally.
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 64, bands: int = 16):
+        self.threshold = threshold
+        self.bands = bands
+        self.hasher = MinHasher(num_perm)
+        self.repository = FeedbackRepository()
+        self._indexes: dict[int, _QuestionIndex] = {}
+
+    def _get_index(self, question_id: int) -> _QuestionIndex:
+        index = self._indexes.setdefault(question_id, _QuestionIndex(self.bands))
+        # Pick up answers saved since the index was last read (or ever).
+        for feedback_id, answer in self.repository.get_answers(
+            question_id, after_id=index.last_id
+        ):
+            normalized = normalize_answer(answer)
+            if normalized:
+                index.add(feedback_id, normalized, self.hasher.signature(normalized))
+        return index
+
+    def find_previous(self, question_id: int, answer: str) -> dict | None:
+        """
+        Returns {"feedback", "similarity", "exact"} of the most similar earlier
+        answer to the question, or None when the answer is new.
+        """
+        normalized = normalize_answer(answer)
+        if question_id is None or not normalized:
+            return None
+        index = self._get_index(question_id)
+
+        feedback_id = index.normalized.get(normalized)
+        exact = feedback_id is not None
+        similarity = 1.0
+        if not exact:
+            signature = self.hasher.signature(normalized)
+            best = None
+            for candidate in index.candidates(signature):
+                score = float(np.mean(index.signatures[candidate] == signature))
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (candidate, score)
+            if best is None:
+                return None
+            feedback_id, similarity = best
+
+        previous = self.repository.get(feedback_id)
+        if previous is None:
+            return None
+        return {
+            "feedback": previous.feedback,
+            "similarity": similarity,
+            "exact": exact,
+        }
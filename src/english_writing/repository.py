@@ -1,17 +1,244 @@
+import math
+import random
+
+from sqlalchemy import String, bindparam, cast, func, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session, select
+
 from common.repository.base import BaseRepository
-from .models import Question, Memo, Feedback
+from database import engine
+from .models import Question, Memo, Feedback, QuestionProgress
+
+# Messages older versions stored as "feedback" when the API call failed.
+FAILED_FEEDBACK_PREFIXES = (
+    "An error occurred while generating feedback",
+    "No valid feedback was received",
+)
+
+
+class TextRowRepository(BaseRepository):
+    """
+    Shared bulk operations for tables holding one line of text per row
+    plus a unique hash of its normalized form.
+    """
+
+    def __init__(self, model, text_field):
+        super().__init__(model)
+        self.text_column = getattr(model, text_field)
+
+    def count(self):
+        with Session(engine) as session:
+            return session.exec(select(func.count()).select_from(self.model)).one()
+
+    def insert_many(self, rows):
+        """
+        Inserts (text, text_hash) pairs in one transaction, silently skipping
+        hashes that already exist.
+        """
+        statement = (
+            insert(self.model)
+            .values(
+                {
+                    self.text_column.key: bindparam("text"),
+                    "text_hash": bindparam("text_hash"),
+                }
+            )
+            .on_conflict_do_nothing(index_elements=["text_hash"])
+        )
+        with engine.begin() as connection:
+            connection.execute(
+                statement, [{"text": text, "text_hash": h} for text, h in rows]
+            )
+
+    def get_unhashed(self, limit, after_id=0):
+        """Returns (id, text) of rows without a hash, in id order."""
+        with Session(engine) as session:
+            statement = (
+                select(self.model.id, self.text_column)
+                .where(self.model.text_hash.is_(None), self.model.id > after_id)
+                .order_by(self.model.id)
+                .limit(limit)
+            )
+            return session.exec(statement).all()
+
+    def set_hashes(self, rows):
+        """
+        Sets text_hash for (id, text_hash) pairs in one transaction. A row
+        whose hash another row already has is a duplicate: it gets
+        "<hash>:<id>" instead, which keeps the unique index satisfied and
+        stops get_unhashed() from returning it on every later import.
+        """
+        params = [{"row_id": i, "new_hash": h} for i, h in rows]
+        statement = (
+            update(self.model)
+            .where(self.model.id == bindparam("row_id"))
+            .values(text_hash=bindparam("new_hash"))
+            .prefix_with("OR IGNORE")
+        )
+        mark_duplicates = (
+            update(self.model)
+            .where(
+                self.model.id == bindparam("row_id"),
+                self.model.text_hash.is_(None),
+            )
+            .values(text_hash=bindparam("new_hash") + ":" + cast(self.model.id, String))
+        )
+        with engine.begin() as connection:
+            connection.execute(statement, params)
+            connection.execute(mark_duplicates, params)
+
 
+class QuestionRepository(TextRowRepository):
+    def __init__(self):
+        super().__init__(Question, "question")
+
+    def get_many(self, ids):
+        with Session(engine) as session:
+            statement = select(self.model).where(self.model.id.in_(ids))
+            return session.exec(statement).all()
+
+    def get_random_unattempted_ids(self, limit, runs=10):
+        """
+        Returns up to `limit` ids of questions that have no progress row yet,
+        taken as `runs` short runs of consecutive ids after random starting
+        points. Each run is a range scan on the primary key that stops after
+        a few rows, instead of sorting every unanswered question by random().
+        """
+        unattempted = (
+            ~select(QuestionProgress.question_id)
+            .where(QuestionProgress.question_id == self.model.id)
+            .exists()
+        )
+        run_length = math.ceil(limit / runs)
+        with Session(engine) as session:
+            low, high = session.exec(
+                select(func.min(self.model.id), func.max(self.model.id))
+            ).one()
+            if low is None:
+                return []
+            ids = {}
+            for _ in range(runs):
+                start = random.randint(low, high)
+                run = session.exec(
+                    select(self.model.id)
+                    .where(self.model.id >= start, unattempted)
+                    .order_by(self.model.id)
+                    .limit(run_length)
+                ).all()
+                if len(run) < run_length:
+                    # Wrap around to the lowest ids.
+                    run += session.exec(
+                        select(self.model.id)
+                        .where(self.model.id < start, unattempted)
+                        .order_by(self.model.id)
+                        .limit(run_length - len(run))
+                    ).all()
+                ids.update(dict.fromkeys(run))
+            return list(ids)[:limit]
 
-class QuestionRepository(BaseRepository):
+
+class MemoRepository(TextRowRepository):
     def __init__(self):
-        super().__init__(Question)
+        super().__init__(Memo, "memo")
 
 
-class MemoRepository(BaseRepository):
+class QuestionProgressRepository(BaseRepository):
     def __init__(self):
-        super().__init__(Memo)
+        super().__init__(QuestionProgress)
+
+    def record_attempt(self, session, question_id, attempted_at, score):
+        """Upserts the question's aggregate row inside the caller's transaction."""
+        statement = insert(self.model).values(
+            question_id=question_id,
+            attempt_count=1,
+            last_attempt_at=attempted_at,
+            last_score=score,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.model.question_id],
+            set_={
+                "attempt_count": self.model.attempt_count + 1,
+                "last_attempt_at": statement.excluded.last_attempt_at,
+                "last_score": statement.excluded.last_score,
+            },
+        )
+        session.exec(statement)
+
+    def get_least_recent(self, limit):
+        """Returns the `limit` progress rows answered longest ago (indexed)."""
+        with Session(engine) as session:
+            statement = (
+                select(self.model)
+                .order_by(self.model.last_attempt_at.asc())
+                .limit(limit)
+            )
+            return session.exec(statement).all()
 
 
 class FeedbackRepository(BaseRepository):
     def __init__(self):
         super().__init__(Feedback)
+        self.progress_repository = QuestionProgressRepository()
+
+    def add(self, question_id, answer, feedback, score=None):
+        """
+        Stores the feedback and updates the question's progress row in the
+        same transaction, so the aggregate never drifts from the history.
+        """
+        instance = self.model(question_id=question_id, answer=answer, feedback=feedback)
+        with Session(engine) as session:
+            session.add(instance)
+            if question_id is not None:
+                self.progress_repository.record_attempt(
+                    session, question_id, instance.timestamp, score
+                )
+            session.commit()
+            session.refresh(instance)
+            return instance
+
+    def get_answers(self, question_id, after_id=0):
+        """
+        Returns (id, answer) of a question's feedback newer than after_id,
+        leaving out rows whose feedback is a stored API error message.
+        """
+        with Session(engine) as session:
+            statement = (
+                select(self.model.id, self.model.answer)
+                .where(
+                    self.model.question_id == question_id,
+                    self.model.id > after_id,
+                    *(
+                        ~self.model.feedback.startswith(prefix)
+                        for prefix in FAILED_FEEDBACK_PREFIXES
+                    ),
+                )
+                .order_by(self.model.id)
+            )
+            return session.exec(statement).all()
+
+    def count(self, question_id=None):
+        with Session(engine) as session:
+            statement = select(func.count()).select_from(self.model)
+            if question_id is not None:
+                statement = statement.where(self.model.question_id == question_id)
+            return session.exec(statement).one()
+
+    def get_page(self, limit=10, cursor=None, question_id=None):
+        """
+        Returns one page of feedback, newest first, and the cursor for the
+        next page (None on the last page). The cursor is the (timestamp, id)
+        of the last row, so older pages are index range scans, not OFFSETs.
+        """
+        with Session(engine) as session:
+            statement = select(self.model)
+            if question_id is not None:
+                statement = statement.where(self.model.question_id == question_id)
+            statement = self._newest_first(
+                statement, self.model.timestamp, cursor
+            ).limit(limit + 1)
+            rows = session.exec(statement).all()
+
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, (rows[-1].timestamp, rows[-1].id)
+        return rows, None
@@ -1,7 +1,68 @@
+import math
+import random
+import re
+from datetime import datetime
+
 from openai import OpenAI
 from openai.types.chat import ChatCompletion
 
-from .repository import QuestionRepository
+from common.prompt.service import complete_chat
+from common.prompt.template import PromptTemplate
+
+from .repository import QuestionRepository, QuestionProgressRepository
+
+FEEDBACK_PROMPT = PromptTemplate(
+    instructions="""
+You are a helpful assistant acting as an English teacher.
+You are an expert English teacher. A student was given a question and wrote an answer in English.
+
+Provide a sample revision (a simple, improved version) for reference.
+Also provide the feedback in Korean, starting with a brief overall summary and then detailing the points above in bullet form.
+
+Please provide constructive feedback on the student's answer.
+Focus on:
+1.  **Grammar:** Correct any grammatical errors per sentence.
+2.  **Vocabulary:** Suggest more appropriate or advanced vocabulary.
+3.  **Clarity & Flow:** Comment on the clarity and naturalness of the writing.
+4.  **Relevance:** Assess if the answer directly addresses the question.
+
+End your response with one line in exactly this form, where N is an overall score from 0 to 10:
+Score: N/10
+""",
+    variables_template="""
+The question:
+"{question}"
+
+The student's answer:
+"{answer}"
+""",
+)
+
+SCORE_PATTERN = re.compile(r"Score:\s*\**\s*(\d+)\s*/\s*10")
+
+
+def parse_score(feedback: str) -> int | None:
+    """Returns the N of the last "Score: N/10" line in the feedback, if any."""
+    matches = SCORE_PATTERN.findall(feedback or "")
+    return min(int(matches[-1]), 10) if matches else None
+
+
+# Never-answered questions are weighted as if last answered this many days ago.
+UNATTEMPTED_AGE_DAYS = 30.0
+
+
+def weighted_sample(items, weights, k, rng=random):
+    """
+    Draws k distinct items, each with probability proportional to its weight
+    (Efraimidis-Spirakis: keep the k largest u ** (1 / w) keys).
+    """
+    keyed = [
+        (math.log(rng.random() or 1e-12) / weight, item)
+        for item, weight in zip(items, weights)
+        if weight > 0
+    ]
+    keyed.sort(key=lambda pair: pair[0], reverse=True)
+    return [item for _, item in keyed[:k]]
 
 
 class QuestionService:
@@ -11,6 +72,7 @@ class QuestionService:
 
     def __init__(self):
         self.repository = QuestionRepository()
+        self.progress_repository = QuestionProgressRepository()
 
     def load_questions(self) -> list[dict]:
         """
@@ -23,6 +85,58 @@ class QuestionService:
             print(f"Error loading questions: {e}")
             return []
 
+    def draw_questions(
+        self, count: int, exclude_ids=(), candidate_limit: int = 200
+    ) -> list[dict]:
+        """
+        Draws up to `count` distinct questions, favouring ones that were
+        answered long ago or rarely. Candidates come from two bounded queries
+        (random never-answered ids and the least recently answered progress
+        rows) instead of reading the whole question table.
+        """
+        try:
+            now = datetime.utcnow()
+            candidates = {
+                question_id: UNATTEMPTED_AGE_DAYS
+                for question_id in self.repository.get_random_unattempted_ids(
+                    candidate_limit
+                )
+            }
+            for progress in self.progress_repository.get_least_recent(candidate_limit):
+                age = now - (progress.last_attempt_at or now)
+                days = age.total_seconds() / 86400
+                candidates[progress.question_id] = days / progress.attempt_count
+            for question_id in exclude_ids:
+                candidates.pop(question_id, None)
+
+            # A small floor keeps just-answered questions possible when
+            # nothing else is left, but very unlikely otherwise.
+            ids = list(candidates)
+            weights = [max(candidates[i], 0.001) for i in ids]
+            picked = weighted_sample(ids, weights, count)
+            questions = {q.id: q for q in self.repository.get_many(picked)}
+            return [
+                {"id": questions[i].id, "question": questions[i].question}
+                for i in picked
+                if i in questions
+            ]
+        except Exception as e:
+            print(f"Error drawing questions: {e}")
+            return []
+
+    def get_progress(self, question_id: int) -> dict | None:
+        """
+        Returns the attempt count, last attempt time and last score of a question.
+        """
+        progress = self.progress_repository.get(question_id)
+        if not progress:
+            return None
+        return {
+            "attempt_count": progress.attempt_count,
+            "last_attempt_at": progress.last_attempt_at,
+            "last_score": progress.last_score,
+        }
+
 
 class FeedbackService:
     """
@@ -37,49 +151,27 @@ class FeedbackService:
         except Exception as e:
             raise ValueError(f"Failed to initialize OpenAI client: {e}")
 
-    def get_feedback(self, question: str, answer: str) -> str:
+    def get_feedback(self, question: str, answer: str) -> str | None:
         """
         Requests feedback from OpenAI based on the given question and answer.
+        Returns None when no feedback could be generated.
         """
-        system_prompt = """
-        You are an expert English teacher.
-        A student was given the following question:
-        "{question}"
-
-        The student provided this answer:
-        "{answer}"
-
-        Provide a sample revision (a simple, improved version) for reference.
-        Also provide the feedback in Korean, starting with a brief overall summary and then detailing the points above in bullet form.
-        
-        Please provide constructive feedback on the student's answer.
-        Focus on:
-        1.  **Grammar:** Correct any grammatical errors per sentence.
-        2.  **Vocabulary:** Suggest more appropriate or advanced vocabulary.
-        3.  **Clarity & Flow:** Comment on the clarity and naturalness of the writing.
-        4.  **Relevance:** Assess if the answer directly addresses the question.
-        """
-
-        formatted_prompt = system_prompt.format(question=question, answer=answer)
-
         try:
-            response: ChatCompletion = self.client.chat.completions.create(
+            response: ChatCompletion = complete_chat(
+                self.client,
+                FEEDBACK_PROMPT,
                 model="gpt-5-nano",  # or "gpt-4"
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant acting as an English teacher.",
-                    },
-                    {"role": "user", "content": formatted_prompt},
-                ],
+                feature="english_writing.feedback",
+                question=question,
+                answer=answer,
             )
 
             feedback = response.choices[0].message.content
-            if feedback:
+            if feedback and feedback.strip():
                 return feedback.strip()
-            else:
-                return "No valid feedback was received from OpenAI."
+            print("No valid feedback was received from OpenAI.")
+            return None
 
         except Exception as e:
             print(f"An error occurred during the OpenAI API call: {e}")
-            return f"An error occurred while generating feedback: {e}"
+            return None
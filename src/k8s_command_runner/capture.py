@@ -0,0 +1,282 @@
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime
+
+CAPTURE_DIR = "storage/private/k8s_captures"
+META_FILE = "meta.json"
+
+
+def _segment_name(segment):
+    return f"segment-{segment:05d}.log.gz"
+
+
+def _index_name(segment):
+    return f"segment-{segment:05d}.idx"
+
+
+class CaptureWriter:
+    """
+    Writes command output to rotating gzip segments under a capture directory.
+
+    Lines are compressed in blocks, each block being its own gzip member, so
+    the segment stays a valid .gz file while every block can be read on its
+    own. For each block an index entry (compressed offset, first line number,
+    line count, first/last timestamp) is appended to the segment's .idx file.
+    """
+
+    def __init__(
+        self,
+        command,
+        storage_dir=CAPTURE_DIR,
+        block_lines=500,
+        flush_interval=5.0,
+        segment_bytes=8 * 1024 * 1024,
+        max_segments=20,
+    ):
+        self.capture_id = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        self.capture_dir = os.path.join(storage_dir, self.capture_id)
+        os.makedirs(self.capture_dir, exist_ok=True)
+        self.block_lines = block_lines
+        self.flush_interval = flush_interval
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.meta = {
+            "id": self.capture_id,
+            "command": command,
+            "started_at": datetime.now().isoformat(),
+            "ended_at": None,
+            "lines": 0,
+        }
+        self._write_meta()
+        self._segment = 1
+        self._line_no = 0
+        self._block = []
+        self._block_started = time.time()
+        # flush() and close() may run in worker threads (see append()); a
+        # cancelled job can still be flushing when it is closed.
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, text):
+        """Appends one or more lines of output, each stamped with the current time."""
+        self.append(text)
+        if self.flush_due():
+            self.flush()
+
+    def append(self, text):
+        """
+        Buffers lines like write() without touching the disk. Callers on an
+        event loop use this and run flush() in a thread when flush_due().
+        """
+        now = time.time()
+        for line in text.splitlines():
+            self._block.append((now, line))
+
+    def flush_due(self):
+        return bool(self._block) and (
+            len(self._block) >= self.block_lines
+            or time.time() - self._block_started >= self.flush_interval
+        )
+
+    def flush(self):
+        """Compresses the pending lines into a new block and indexes it."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._block:
+            return
+        data = "".join(f"{ts:.3f}\t{line}\n" for ts, line in self._block)
+        segment_path = os.path.join(self.capture_dir, _segment_name(self._segment))
+        with open(segment_path, "ab") as f:
+            offset = f.tell()
+            f.write(gzip.compress(data.encode("utf-8")))
+            size = f.tell()
+        entry = {
+            "offset": offset,
+            "first_line": self._line_no,
+            "lines": len(self._block),
+            "first_ts": self._block[0][0],
+            "last_ts": self._block[-1][0],
+        }
+        with open(
+            os.path.join(self.capture_dir, _index_name(self._segment)),
+            "a",
+            encoding="utf-8",
+        ) as f:
+            f.write(json.dumps(entry) + "\n")
+
+        self._line_no += len(self._block)
+        self._block = []
+        self._block_started = time.time()
+        if size >= self.segment_bytes:
+            self._segment += 1
+            self._prune_segments()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self.meta["ended_at"] = datetime.now().isoformat()
+            self.meta["lines"] = self._line_no
+            self._write_meta()
+
+    def _prune_segments(self):
+        oldest = self._segment - self.max_segments
+        for segment in range(oldest, 0, -1):
+            for name in (_segment_name(segment), _index_name(segment)):
+                path = os.path.join(self.capture_dir, name)
+                if not os.path.exists(path):
+                    return
+                os.remove(path)
+
+    def _write_meta(self):
+        with open(
+            os.path.join(self.capture_dir, META_FILE), "w", encoding="utf-8"
+        ) as f:
+            json.dump(self.meta, f, ensure_ascii=False, indent=4)
+
+
+def capture_stream(lines, writer):
+    """Passes a line stream through unchanged while writing it to a capture."""
+    try:
+        for line in lines:
+            writer.write(line)
+            yield line
+    finally:
+        writer.close()
+        if hasattr(lines, "close"):
+            lines.close()
+
+
+def list_captures(storage_dir=CAPTURE_DIR):
+    """Returns the metadata of all captures, newest first."""
+    if not os.path.isdir(storage_dir):
+        return []
+    captures = []
+    for name in os.listdir(storage_dir):
+        meta_path = os.path.join(storage_dir, name, META_FILE)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                captures.append(json.load(f))
+        except (IOError, json.JSONDecodeError):
+            continue
+    return sorted(captures, key=lambda meta: meta["started_at"], reverse=True)
+
+
+def delete_capture(capture_id, storage_dir=CAPTURE_DIR):
+    shutil.rmtree(os.path.join(storage_dir, capture_id), ignore_errors=True)
+
+
+class CaptureReader:
+    """
+    Pages through and searches a capture using its block index.
+
+    Only the small index is held in memory; line data is decompressed block
+    by block starting at the block that contains the requested line or time.
+    """
+
+    def __init__(self, capture_id, storage_dir=CAPTURE_DIR):
+        self.capture_dir = os.path.join(storage_dir, capture_id)
+        self.blocks = []
+        segments = sorted(
+            int(name[len("segment-") : -len(".idx")])
+            for name in os.listdir(self.capture_dir)
+            if name.endswith(".idx")
+        )
+        for segment in segments:
+            with open(
+                os.path.join(self.capture_dir, _index_name(segment)),
+                "r",
+                encoding="utf-8",
+            ) as f:
+                for row in f:
+                    entry = json.loads(row)
+                    entry["segment"] = segment
+                    self.blocks.append(entry)
+        self._first_lines = [block["first_line"] for block in self.blocks]
+
+    @property
+    def first_line(self):
+        return self.blocks[0]["first_line"] if self.blocks else 0
+
+    @property
+    def total_lines(self):
+        if not self.blocks:
+            return 0
+        return self.blocks[-1]["first_line"] + self.blocks[-1]["lines"]
+
+    def page(self, start_line, count):
+        """Returns up to `count` (line_no, timestamp, text) tuples from start_line."""
+        if not self.blocks:
+            return []
+        start_line = max(start_line, self.first_line)
+        position = max(bisect_right(self._first_lines, start_line) - 1, 0)
+        result = []
+        for line_no, ts, text in self._iter_lines(position):
+            if line_no < start_line:
+                continue
+            result.append((line_no, ts, text))
+            if len(result) >= count:
+                break
+        return result
+
+    def search(self, pattern=None, since=None, until=None, limit=500):
+        """
+        Returns lines matching the regex within [since, until] (datetimes),
+        skipping every block whose time range lies outside the window.
+        """
+        regex = re.compile(pattern) if pattern else None
+        since_ts = since.timestamp() if since else None
+        until_ts = until.timestamp() if until else None
+        result = []
+        for position, block in enumerate(self.blocks):
+            if since_ts is not None and block["last_ts"] < since_ts:
+                continue
+            if until_ts is not None and block["first_ts"] > until_ts:
+                break
+            for line_no, ts, text in self._iter_lines(position, single_block=True):
+                if since_ts is not None and ts < since_ts:
+                    continue
+                if until_ts is not None and ts > until_ts:
+                    break
+                if regex and not regex.search(text):
+                    continue
+                result.append((line_no, ts, text))
+                if len(result) >= limit:
+                    return result
+        return result
+
+    def _iter_lines(self, position, single_block=False):
+        """Yields (line_no, timestamp, text) starting at the given block."""
+        block = self.blocks[position]
+        segment, offset = block["segment"], block["offset"]
+        line_no = block["first_line"]
+        remaining = block["lines"] if single_block else None
+        last_segment = self.blocks[-1]["segment"]
+        while segment <= last_segment:
+            path = os.path.join(self.capture_dir, _segment_name(segment))
+            with open(path, "rb") as raw:
+                raw.seek(offset)
+                with gzip.GzipFile(fileobj=raw) as f:
+                    for row in f:
+                        if remaining is not None:
+                            if remaining == 0:
+                                return
+                            remaining -= 1
+                        ts, _, text = row.decode("utf-8").rstrip("\n").partition("\t")
+                        yield line_no, float(ts), text
+                        line_no += 1
+            if single_block:
+                return
+            segment, offset = segment + 1, 0
@@ -1,7 +1,26 @@
-import subprocess
+import re
 
 import streamlit as st
-from k8s_command_runner.service import run_kubectl_command, stream_command
+from k8s_command_runner.service import (
+    CommandExecutor,
+    interpret_kubectl_result,
+    stream_command,
+    stream_pod_logs,
+    select_pods,
+    parse_pod_names,
+    collect_pod_diagnostics,
+    discover_contexts,
+    build_context_map,
+    probe_contexts,
+    get_cached_health,
+    LogFilter,
+)
+from k8s_command_runner.capture import (
+    CaptureWriter,
+    CaptureReader,
+    capture_stream,
+    list_captures,
+)
 import pandas as pd
 from io import StringIO
 
@@ -42,16 +61,27 @@ CONTEXT_MAP = {
         ],
     },
 }
-ENVS = list(CONTEXT_MAP.keys())
+
+
+def get_context_map():
+    """
+    Returns the {env: {region: [contexts]}} map discovered from the local
+    kubeconfig, falling back to CONTEXT_MAP when discovery fails.
+    """
+    contexts = discover_contexts()
+    if not contexts:
+        return CONTEXT_MAP
+    return build_context_map(contexts, CONTEXT_MAP)
 
 
 def initialize_session_state():
     """Initializes session state for the application."""
+    context_map = get_context_map()
     if "selected_env" not in st.session_state:
-        st.session_state.selected_env = ENVS[0]
+        st.session_state.selected_env = list(context_map.keys())[0]
     if "selected_region" not in st.session_state:
         st.session_state.selected_region = list(
-            CONTEXT_MAP[st.session_state.selected_env].keys()
+            context_map[st.session_state.selected_env].keys()
         )[0]
     if "pod_info" not in st.session_state:
         st.session_state.pod_info = None
@@ -65,19 +95,63 @@ def initialize_session_state():
         st.session_state.error = ""
     if "pod_name" not in st.session_state:
         st.session_state.pod_name = ""
+    if "log_include" not in st.session_state:
+        st.session_state.log_include = ""
+    if "log_exclude" not in st.session_state:
+        st.session_state.log_exclude = ""
+    if "log_min_level" not in st.session_state:
+        st.session_state.log_min_level = "ALL"
+    if "log_json_fields" not in st.session_state:
+        st.session_state.log_json_fields = ""
+    if "log_filter" not in st.session_state:
+        # The running stream reads this object; widget callbacks update it.
+        st.session_state.log_filter = LogFilter()
+    if "log_stream" not in st.session_state:
+        st.session_state.log_stream = None
+    if "log_stream_output" not in st.session_state:
+        st.session_state.log_stream_output = ""
+    if "stern_command" not in st.session_state:
+        st.session_state.stern_command = None
+    if "capture_enabled" not in st.session_state:
+        st.session_state.capture_enabled = False
+    if "executor" not in st.session_state:
+        st.session_state.executor = CommandExecutor()
+    if "pods_job_id" not in st.session_state:
+        st.session_state.pods_job_id = None
+    if "diagnostics" not in st.session_state:
+        st.session_state.diagnostics = None
+    if "diagnostics_error" not in st.session_state:
+        st.session_state.diagnostics_error = ""
 
 
 def update_callbacks():
-    """Callback to reset region if it's not valid for the selected env."""
+    """Callback to reset env/region if they're not valid for the context map."""
+    context_map = get_context_map()
+    if st.session_state.selected_env not in context_map:
+        st.session_state.selected_env = list(context_map.keys())[0]
     if (
         st.session_state.selected_region
-        not in CONTEXT_MAP[st.session_state.selected_env]
+        not in context_map[st.session_state.selected_env]
     ):
         st.session_state.selected_region = list(
-            CONTEXT_MAP[st.session_state.selected_env].keys()
+            context_map[st.session_state.selected_env].keys()
         )[0]
 
 
+def probe_environment(env):
+    """Probes the API server of every context in the env concurrently."""
+    contexts = [
+        context for names in get_context_map()[env].values() for context in names
+    ]
+    return probe_contexts(contexts)
+
+
+def describe_context(context):
+    """Label for the context selectbox, including the last probe result."""
+    health = get_cached_health(context)
+    return f"{context} · {health.describe()}" if health else context
+
+
 def get_pods_logic(kubecontext, namespace, grep_filter):
     """Handles the logic for the 'Get Pods' button click."""
     st.cache_data.clear()
@@ -88,12 +162,39 @@ def get_pods_logic(kubecontext, namespace, grep_filter):
 
     command_to_run = full_command_str if grep_filter else command_list
     use_shell_for_run = bool(grep_filter)
-    st.session_state.pod_info, st.session_state.error_info = run_kubectl_command(
-        command_to_run, use_shell_for_run
+    executor = st.session_state.executor
+    if st.session_state.pods_job_id is not None:
+        executor.cancel(st.session_state.pods_job_id)
+    job = executor.submit(
+        command_to_run, use_shell_for_run, timeout=30, label=full_command_str
     )
+    st.session_state.pods_job_id = job.id
     return full_command_str
 
 
+def poll_pods_job():
+    """
+    Moves the result of a finished 'Get Pods' job into the session state.
+    Returns True when the job has just finished.
+    """
+    job_id = st.session_state.pods_job_id
+    if job_id is None:
+        return False
+    job = st.session_state.executor.jobs.get(job_id)
+    if job is None or not job.done:
+        return False
+    if job.returncode is None:
+        st.session_state.pod_info, st.session_state.error_info = None, job.stderr
+    else:
+        st.session_state.pod_info, st.session_state.error_info = (
+            interpret_kubectl_result(
+                job.command, job.use_shell, job.returncode, job.stdout, job.stderr
+            )
+        )
+    st.session_state.pods_job_id = None
+    return True
+
+
 def handle_pod_specific_commands(kubecontext, namespace):
     """Handles the logic for pod-specific commands like 'Logs -f' and 'Describe Pod'."""
     if st.session_state.pod_name:
@@ -102,37 +203,187 @@ def handle_pod_specific_commands(kubecontext, namespace):
         elif st.session_state.get("describe_button"):
             st.session_state.command = f"kubectl describe pod {st.session_state.pod_name} --context {kubecontext} -n {namespace}"
         elif st.session_state.get("stern"):
-            st.session_state.command = f"stern {st.session_state.pod_name} -n {namespace} --context {kubecontext} --max-log-requests 150 -c data-engineering-sqs-ingestor | grep ERROR"
+            st.session_state.command = f"stern {st.session_state.pod_name} -n {namespace} --context {kubecontext} --max-log-requests 150 -c data-engineering-sqs-ingestor"
+            # Runs of this command only show ERROR lines (formerly `| grep ERROR`).
+            st.session_state.stern_command = st.session_state.command
     else:
         st.warning("Please enter a Pod Name.")
         st.session_state.command = ""
 
 
+def _log_filter_inputs():
+    min_level = st.session_state.log_min_level
+    return {
+        "include": st.session_state.log_include,
+        "exclude": st.session_state.log_exclude,
+        "min_level": None if min_level == "ALL" else min_level,
+        "json_fields": st.session_state.log_json_fields,
+    }
+
+
+def build_log_filter(require=None):
+    """
+    Builds the LogFilter for a new stream from the filter inputs and makes
+    it the session's filter, so later input changes reach the stream.
+    """
+    log_filter = LogFilter(require=require, **_log_filter_inputs())
+    st.session_state.log_filter = log_filter
+    return log_filter
+
+
+def update_log_filter():
+    """
+    Callback of the filter inputs: updates the running stream's filter in
+    place, so the stream keeps running with the new filter.
+    """
+    try:
+        st.session_state.log_filter.update(**_log_filter_inputs())
+        st.session_state.error = ""
+    except re.error as e:
+        st.session_state.error = f"Invalid log filter pattern: {e}"
+
+
+def _start_log_stream(stream):
+    """
+    Keeps the stream in the session state, so it survives the reruns that
+    widget changes cause and the page can keep reading it.
+    """
+    stop_log_stream()
+    st.session_state.log_stream = stream
+    st.session_state.log_stream_output = ""
+
+
+def stop_log_stream():
+    """Closes the running stream, which terminates its process."""
+    if st.session_state.log_stream is not None:
+        st.session_state.log_stream.close()
+        st.session_state.log_stream = None
+
+
 def run_specific_command():
     """Handles the logic for the 'Run Command' button."""
     st.session_state.output = ""
     st.session_state.error = ""
     if st.session_state.command:
         if "logs -f" in st.session_state.command or "stern" in st.session_state.command:
-            return stream_command(st.session_state.command)
-        else:
+            errors_only = st.session_state.command == st.session_state.stern_command
             try:
-                result = subprocess.run(
+                log_filter = build_log_filter(require="ERROR" if errors_only else None)
+            except re.error as e:
+                st.session_state.error = f"Invalid log filter pattern: {e}"
+                return
+            _start_log_stream(
+                _maybe_capture(
+                    stream_command(st.session_state.command, log_filter),
                     st.session_state.command,
-                    shell=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=60,
                 )
-                st.session_state.output = result.stdout
-                st.session_state.error = result.stderr
-            except subprocess.TimeoutExpired:
-                st.session_state.error = "Error: Command timed out."
-            except Exception as e:
-                st.session_state.error = f"An error occurred: {e}"
+            )
+        else:
+            sink = None
+            if st.session_state.capture_enabled:
+                sink = CaptureWriter(st.session_state.command)
+            st.session_state.executor.submit(
+                st.session_state.command, timeout=60, sink=sink
+            )
     else:
         st.session_state.error = "Please enter or generate a command."
-    return None
+
+
+def get_jobs():
+    """Returns the background jobs of this session, newest first."""
+    return list(reversed(st.session_state.executor.jobs.values()))
+
+
+def has_running_jobs():
+    return bool(st.session_state.executor.running_jobs())
+
+
+def cancel_job(job_id):
+    st.session_state.executor.cancel(job_id)
+
+
+def clear_finished_jobs():
+    st.session_state.executor.clear_finished()
+
+
+def tail_matching_pods(kubecontext, namespace):
+    """
+    Handles the 'Tail Matching' button: tails every pod in the cached pod list
+    whose name matches the Pod Name field as a regex.
+    """
+    st.session_state.output = ""
+    st.session_state.error = ""
+    if not st.session_state.pod_info:
+        st.session_state.error = "Run 'Get Pods' first to load the pod list."
+        return
+    try:
+        pods = select_pods(st.session_state.pod_info, st.session_state.pod_name)
+        log_filter = build_log_filter()
+    except re.error as e:
+        st.session_state.error = f"Invalid pattern: {e}"
+        return
+    if not pods:
+        st.session_state.error = "No pods in the pod list match the selector."
+        return
+    _start_log_stream(
+        _maybe_capture(
+            stream_pod_logs(pods, kubecontext, namespace, log_filter=log_filter),
+            f"tail {st.session_state.pod_name} --context {kubecontext} -n {namespace}",
+        )
+    )
+
+
+def _maybe_capture(stream, command):
+    """Tees the stream into a disk capture when capture mode is on."""
+    if not st.session_state.capture_enabled:
+        return stream
+    return capture_stream(stream, CaptureWriter(command))
+
+
+def get_captures():
+    """Returns the metadata of all stored captures, newest first."""
+    return list_captures()
+
+
+def get_capture_page(capture_id, page, page_size):
+    """Returns one page of lines from a capture and the capture's line range."""
+    reader = CaptureReader(capture_id)
+    start = reader.first_line + page * page_size
+    return reader.page(start, page_size), reader.first_line, reader.total_lines
+
+
+def search_capture(capture_id, pattern, since, until, limit=500):
+    """Searches a capture by regex and time range (datetimes or None)."""
+    return CaptureReader(capture_id).search(pattern, since, until, limit)
+
+
+def get_cached_pod_names():
+    """Returns the pod names from the last 'Get Pods' result."""
+    return parse_pod_names(st.session_state.pod_info)
+
+
+def run_batch_diagnostics(contexts, namespace, pod_names, selector):
+    """
+    Handles the 'Diagnose' button. Stores the per-pod reports in the session
+    state so they survive reruns.
+    """
+    if not contexts:
+        st.session_state.diagnostics_error = "Select at least one context."
+        return
+    if not pod_names and not selector:
+        st.session_state.diagnostics_error = "Select pods or enter a selector regex."
+        return
+    try:
+        reports, errors = collect_pod_diagnostics(
+            contexts, namespace, pod_names, selector
+        )
+    except re.error as e:
+        st.session_state.diagnostics_error = f"Invalid selector: {e}"
+        return
+    st.session_state.diagnostics = reports
+    st.session_state.diagnostics_error = "\n".join(
+        f"{context}: {error}" for context, error in errors.items()
+    )
 
 
 def parse_pod_info(pod_info, grep_filter):
@@ -1,4 +1,161 @@
+import asyncio
+import itertools
+import json
+import os
+import re
+import signal
 import subprocess
+import threading
+import time
+
+LOG_LEVELS = ["TRACE", "DEBUG", "INFO", "WARN", "ERROR", "FATAL"]
+LEVEL_ALIASES = {
+    "WARNING": "WARN",
+    "ERR": "ERROR",
+    "CRITICAL": "FATAL",
+    "PANIC": "FATAL",
+}
+LEVEL_BADGES = {
+    "TRACE": "⚪",
+    "DEBUG": "⚪",
+    "INFO": "🔵",
+    "WARN": "🟡",
+    "ERROR": "🔴",
+    "FATAL": "🔴",
+}
+LEVEL_PATTERN = re.compile(
+    r"\b(TRACE|DEBUG|INFO|WARNING|WARN|ERROR|ERR|FATAL|CRITICAL|PANIC)\b",
+    re.IGNORECASE,
+)
+JSON_LEVEL_KEYS = ("level", "severity", "lvl", "log.level")
+JSON_MESSAGE_KEYS = ("msg", "message", "log")
+
+
+def normalize_level(level):
+    """Maps a raw level name (e.g. 'warning', 'err') onto one of LOG_LEVELS."""
+    if not level:
+        return None
+    level = str(level).upper()
+    level = LEVEL_ALIASES.get(level, level)
+    return level if level in LOG_LEVELS else None
+
+
+class LogFilter:
+    """
+    Filters and formats a stream of log lines in Python.
+
+    Lines are kept when they match the include regex (if any), don't match
+    the exclude regex and are at or above the minimum level. JSON log
+    lines are condensed to their level, message and the requested fields.
+    The filter is read on every line, so calling update() while a stream is
+    running takes effect without restarting the underlying process.
+
+    `require` is an extra regex every line must match that update() leaves
+    alone, for filters that belong to one command (e.g. Stern's ERROR-only).
+    """
+
+    def __init__(
+        self,
+        include=None,
+        exclude=None,
+        min_level=None,
+        json_fields=None,
+        badges=True,
+        require=None,
+    ):
+        self.require = re.compile(require) if require else None
+        self.update(include, exclude, min_level, json_fields, badges)
+
+    def update(
+        self, include=None, exclude=None, min_level=None, json_fields=None, badges=True
+    ):
+        """
+        Recompiles the filter. Raises re.error for an invalid pattern, in
+        which case the filter is left unchanged.
+        """
+        include = re.compile(include) if include else None
+        exclude = re.compile(exclude) if exclude else None
+        self.include, self.exclude = include, exclude
+        self.min_level = normalize_level(min_level)
+        self.json_fields = _split_fields(json_fields)
+        self.badges = badges
+
+    def is_active(self):
+        return bool(
+            self.require
+            or self.include
+            or self.exclude
+            or self.min_level
+            or self.json_fields
+        )
+
+    def apply(self, line):
+        """Returns the formatted line, or None when the line is filtered out."""
+        if self.require and not self.require.search(line):
+            return None
+        if self.include and not self.include.search(line):
+            return None
+        if self.exclude and self.exclude.search(line):
+            return None
+
+        record = _parse_json_line(line)
+        if record is not None:
+            level = normalize_level(_first_value(record, JSON_LEVEL_KEYS))
+        else:
+            match = LEVEL_PATTERN.search(line)
+            level = normalize_level(match.group(1)) if match else None
+
+        if self.min_level and (
+            level is None or LOG_LEVELS.index(level) < LOG_LEVELS.index(self.min_level)
+        ):
+            return None
+
+        if record is not None:
+            line = self._format_record(record, level)
+        if self.badges and level:
+            line = f"{LEVEL_BADGES[level]} {line}"
+        return line
+
+    def _format_record(self, record, level):
+        parts = []
+        if level:
+            parts.append(f"[{level}]")
+        message = _first_value(record, JSON_MESSAGE_KEYS)
+        if message is not None:
+            parts.append(str(message).rstrip("\n"))
+        for field in self.json_fields:
+            value = record.get(field)
+            if value is not None:
+                parts.append(f"{field}={value}")
+        if not parts:
+            return json.dumps(record, ensure_ascii=False) + "\n"
+        return " ".join(parts) + "\n"
+
+
+def _split_fields(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [v.strip() for v in value if v and v.strip()]
+
+
+def _parse_json_line(line):
+    stripped = line.strip()
+    if not stripped.startswith("{"):
+        return None
+    try:
+        record = json.loads(stripped)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def _first_value(record, keys):
+    for key in keys:
+        if key in record:
+            return record[key]
+    return None
 
 
 def run_kubectl_command(command, use_shell):
@@ -19,17 +176,29 @@ def run_kubectl_command(command, use_shell):
             "Error: 'kubectl' command not found. Please ensure it is installed and in your PATH.",
         )
     except subprocess.CalledProcessError as e:
-        if use_shell and "grep" in command and e.returncode == 1 and not e.stderr:
-            return "No matching pods found.", None
-        return None, f"Error executing command:\n{e.stderr}"
+        return interpret_kubectl_result(command, use_shell, e.returncode, "", e.stderr)
     except subprocess.TimeoutExpired:
         return None, "Error: Command timed out."
     except Exception as e:
         return None, f"An unexpected error occurred: {e}"
 
 
-def stream_command(command):
-    """Runs a command and yields its output line by line."""
+def interpret_kubectl_result(command, use_shell, returncode, stdout, stderr):
+    """Maps a finished kubectl command onto the (output, error) pair shown in the UI."""
+    if returncode == 0:
+        return stdout, None
+    if use_shell and "grep" in command and returncode == 1 and not stderr:
+        return "No matching pods found.", None
+    return None, f"Error executing command:\n{stderr}"
+
+
+def stream_command(command, log_filter=None):
+    """
+    Runs a command and yields its output line by line.
+
+    When a LogFilter is given, every line passes through it (while it is
+    active) before being yielded, so filtered-out lines never reach the UI.
+    """
     process = subprocess.Popen(
         command,
         shell=True,
@@ -37,10 +206,599 @@ def stream_command(command):
         stderr=subprocess.STDOUT,
         text=True,
         universal_newlines=True,
+        # Own process group, so stopping the stream also stops the kubectl or
+        # stern the shell started.
+        start_new_session=True,
     )
-    for line in iter(process.stdout.readline, ""):
-        yield line
-    process.stdout.close()
+    try:
+        for line in iter(process.stdout.readline, ""):
+            if log_filter is not None and log_filter.is_active():
+                line = log_filter.apply(line)
+                if line is None:
+                    continue
+            yield line
+    except GeneratorExit:
+        # The consumer stopped reading (e.g. the page was stopped); don't
+        # leave a `logs -f` process running in the background.
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        process.wait()
+        raise
+    finally:
+        process.stdout.close()
     return_code = process.wait()
     if return_code != 0:
         yield f"\nError: Process exited with code {return_code}"
+
+
+KUBECTL_TIMEOUT_SECONDS = 10
+CONTEXT_NAME_PATTERN = re.compile(
+    r"^k8s-(?P<env>.+)-(?P<region>[a-z]{2}\d*)-(?:cluster|shared)-\d+$"
+)
+_context_cache = {"key": None, "contexts": None}
+_health_cache = {}
+
+
+class ContextHealth:
+    """Result of probing one context's API server."""
+
+    def __init__(self, context, reachable, latency_ms, error=None):
+        self.context = context
+        self.reachable = reachable
+        self.latency_ms = latency_ms
+        self.error = error
+        self.checked_at = time.time()
+
+    def describe(self):
+        if self.reachable:
+            return f"🟢 {self.latency_ms:.0f} ms"
+        return "🔴 unreachable"
+
+
+def _kubeconfig_paths():
+    kubeconfig = os.environ.get("KUBECONFIG")
+    if kubeconfig:
+        return [path for path in kubeconfig.split(os.pathsep) if path]
+    return [os.path.expanduser("~/.kube/config")]
+
+
+def _kubeconfig_key():
+    key = []
+    for path in _kubeconfig_paths():
+        try:
+            key.append((path, os.stat(path).st_mtime_ns))
+        except OSError:
+            key.append((path, None))
+    return tuple(key)
+
+
+def discover_contexts():
+    """
+    Lists the context names in the local kubeconfig. The result is cached
+    until one of the kubeconfig files changes. Returns None if kubectl is
+    unavailable or fails.
+    """
+    key = _kubeconfig_key()
+    if _context_cache["key"] == key:
+        return _context_cache["contexts"]
+    try:
+        result = subprocess.run(
+            ["kubectl", "config", "get-contexts", "-o", "name"],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=KUBECTL_TIMEOUT_SECONDS,
+        )
+        contexts = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+    except (OSError, subprocess.SubprocessError):
+        contexts = None
+    _context_cache.update(key=key, contexts=contexts)
+    return contexts
+
+
+def build_context_map(contexts, known_map=None):
+    """
+    Groups context names into {env: {region: [contexts]}}. Contexts present in
+    known_map keep their place there, names like 'k8s-<env>-<region>-cluster-N'
+    are parsed, and everything else lands under 'other'.
+    """
+    known = {}
+    for env, regions in (known_map or {}).items():
+        for region, names in regions.items():
+            for name in names:
+                known[name] = (env, region)
+
+    context_map = {}
+    for context in contexts:
+        if context in known:
+            env, region = known[context]
+        else:
+            match = CONTEXT_NAME_PATTERN.match(context)
+            env, region = (
+                (match["env"], match["region"]) if match else ("other", "default")
+            )
+        context_map.setdefault(env, {}).setdefault(region, []).append(context)
+    for regions in context_map.values():
+        for names in regions.values():
+            names.sort()
+    return context_map
+
+
+async def _probe_context(context, timeout):
+    command = ["kubectl", "get", "--raw", "/readyz", "--context", context]
+    command.append(f"--request-timeout={timeout}s")
+    started = time.perf_counter()
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except OSError as e:
+        return ContextHealth(context, False, None, str(e))
+    try:
+        _, stderr = await asyncio.wait_for(process.communicate(), timeout + 2)
+    except TimeoutError:
+        process.kill()
+        await process.wait()
+        return ContextHealth(context, False, None, "Probe timed out.")
+    latency_ms = (time.perf_counter() - started) * 1000
+    if process.returncode != 0:
+        error = stderr.decode("utf-8", errors="replace").strip()
+        return ContextHealth(context, False, None, error)
+    return ContextHealth(context, True, latency_ms)
+
+
+async def _probe_all(contexts, timeout):
+    return await asyncio.gather(
+        *(_probe_context(context, timeout) for context in contexts)
+    )
+
+
+def probe_contexts(contexts, timeout=5, max_age=60):
+    """
+    Probes every context's API server concurrently and returns
+    {context: ContextHealth}. Results younger than max_age seconds are
+    served from the cache instead of being probed again.
+
+    The latency includes starting kubectl, so compare it between contexts
+    rather than reading it as pure network round-trip time.
+    """
+    now = time.time()
+    stale = [
+        context
+        for context in contexts
+        if context not in _health_cache
+        or now - _health_cache[context].checked_at > max_age
+    ]
+    if stale:
+        for health in asyncio.run(_probe_all(stale, timeout)):
+            _health_cache[health.context] = health
+    return {context: _health_cache[context] for context in contexts}
+
+
+def get_cached_health(context):
+    """Returns the last probe result for a context, or None."""
+    return _health_cache.get(context)
+
+
+class CommandJob:
+    """A command submitted to a CommandExecutor and its (partial) output."""
+
+    def __init__(self, job_id, command, use_shell, label=None, sink=None):
+        self.id = job_id
+        self.command = command
+        self.use_shell = use_shell
+        self.label = label or (command if use_shell else " ".join(command))
+        self.sink = sink
+        self.status = "running"
+        self.returncode = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self._stdout = []
+        self._stderr = []
+        self._future = None
+
+    @property
+    def stdout(self):
+        return "".join(self._stdout)
+
+    @property
+    def stderr(self):
+        return "".join(self._stderr)
+
+    @property
+    def done(self):
+        return self.status != "running"
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.time()) - self.started_at
+
+
+_executor_loop = {"loop": None}
+_executor_loop_lock = threading.Lock()
+
+
+def _get_executor_loop():
+    """
+    Returns the background event loop shared by every CommandExecutor, so
+    sessions don't each leave a loop thread behind. Started on first use.
+    """
+    with _executor_loop_lock:
+        if _executor_loop["loop"] is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="command-executor", daemon=True
+            ).start()
+            _executor_loop["loop"] = loop
+        return _executor_loop["loop"]
+
+
+class CommandExecutor:
+    """
+    Runs commands on a background asyncio event loop so the Streamlit script
+    never blocks on them. Several jobs can run at once; their output is
+    collected line by line and can be read while they are still running.
+    One executor per session keeps that session's jobs; the loop running
+    them is shared.
+    """
+
+    def __init__(self):
+        self._loop = _get_executor_loop()
+        self._ids = itertools.count(1)
+        self.jobs = {}
+
+    def submit(self, command, use_shell=True, timeout=60, label=None, sink=None):
+        """
+        Starts a command and returns its CommandJob immediately. `sink` is an
+        optional CaptureWriter that receives stdout as it arrives; its disk
+        writes run in worker threads, off the shared loop.
+        """
+        job = CommandJob(next(self._ids), command, use_shell, label, sink)
+        self.jobs[job.id] = job
+        job._future = asyncio.run_coroutine_threadsafe(
+            self._run(job, timeout), self._loop
+        )
+        return job
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job and not job.done:
+            job._future.cancel()
+
+    def clear_finished(self):
+        self.jobs = {job_id: job for job_id, job in self.jobs.items() if not job.done}
+
+    def running_jobs(self):
+        return [job for job in self.jobs.values() if not job.done]
+
+    async def _run(self, job, timeout):
+        process = None
+        pumps = []
+        try:
+            # Each job gets its own process group so that cancelling a shell
+            # command also stops the kubectl it started.
+            if job.use_shell:
+                process = await asyncio.create_subprocess_shell(
+                    job.command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    limit=1024 * 1024,
+                    start_new_session=True,
+                )
+            else:
+                process = await asyncio.create_subprocess_exec(
+                    *job.command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    limit=1024 * 1024,
+                    start_new_session=True,
+                )
+            pumps = [
+                asyncio.create_task(self._pump(process.stdout, job._stdout, job.sink)),
+                asyncio.create_task(self._pump(process.stderr, job._stderr)),
+            ]
+            async with asyncio.timeout(timeout):
+                await asyncio.gather(*pumps)
+                await process.wait()
+            job.returncode = process.returncode
+            job.status = "done" if process.returncode == 0 else "failed"
+        except FileNotFoundError:
+            job._stderr.append(
+                "Error: command not found. Please ensure it is installed and in your PATH."
+            )
+            job.status = "failed"
+        except TimeoutError:
+            job._stderr.append("\nError: Command timed out.")
+            job.status = "timeout"
+        except asyncio.CancelledError:
+            job._stderr.append("\nCancelled.")
+            job.status = "cancelled"
+        except Exception as e:
+            job._stderr.append(f"An unexpected error occurred: {e}")
+            job.status = "failed"
+        finally:
+            if process is not None and process.returncode is None:
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                await process.wait()
+            for pump in pumps:
+                pump.cancel()
+            await asyncio.gather(*pumps, return_exceptions=True)
+            if job.sink is not None:
+                await asyncio.to_thread(job.sink.close)
+            job.finished_at = time.time()
+
+    @staticmethod
+    async def _pump(stream, chunks, sink=None):
+        async for raw_line in stream:
+            line = raw_line.decode("utf-8", errors="replace")
+            chunks.append(line)
+            if sink is not None:
+                # The loop is shared by every session's jobs; compressing and
+                # writing a block happens in a worker thread instead.
+                sink.append(line)
+                if sink.flush_due():
+                    await asyncio.to_thread(sink.flush)
+
+
+def parse_pod_names(pod_info):
+    """Extracts pod names (the first column) from `kubectl get pods` output."""
+    names = []
+    if not pod_info or "No matching pods found" in pod_info:
+        return names
+    for row in pod_info.splitlines():
+        columns = row.split()
+        if not columns or columns[0] == "NAME":
+            continue
+        names.append(columns[0])
+    return names
+
+
+def select_pods(pod_info, selector):
+    """Returns the pods from the cached pod list whose name matches the regex."""
+    pattern = re.compile(selector)
+    return [name for name in parse_pod_names(pod_info) if pattern.search(name)]
+
+
+async def _tail_pod(pod, command, queue, processes):
+    """
+    Streams one pod's log lines into the shared queue, ending with None.
+    Failures become a final error line for the pod; the None is always sent
+    (unless the stream was cancelled) so the merged stream never waits on a
+    pod that is gone.
+    """
+    process = None
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            limit=1024 * 1024,
+        )
+        processes.append(process)
+        async for raw_line in process.stdout:
+            # put() blocks while the queue is full, which stops reading this
+            # pipe and lets kubectl itself slow down instead of buffering.
+            await queue.put((pod, raw_line.decode("utf-8", errors="replace")))
+        return_code = await process.wait()
+        if return_code != 0:
+            await queue.put((pod, f"Error: logs exited with code {return_code}\n"))
+    except FileNotFoundError:
+        await queue.put((pod, "Error: 'kubectl' command not found.\n"))
+    except OSError as e:
+        await queue.put((pod, f"Error: could not run kubectl: {e}\n"))
+    except Exception as e:
+        # E.g. a line longer than the read limit raises ValueError.
+        await queue.put((pod, f"Error: stopped reading logs: {e}\n"))
+    finally:
+        cancelled = asyncio.current_task().cancelling()
+        if process is not None and process.returncode is None:
+            process.terminate()
+            if not cancelled:
+                # Drain the rest of the pipe so its transport can close.
+                await process.communicate()
+        if not cancelled:
+            await queue.put((pod, None))
+
+
+async def aggregate_pod_logs(
+    pods,
+    kubecontext,
+    namespace,
+    container=None,
+    log_filter=None,
+    max_buffered_lines=1000,
+):
+    """
+    Tails `kubectl logs -f` for every pod concurrently and yields one merged,
+    pod-prefixed stream. Lines keep their per-pod order and are interleaved
+    in arrival order.
+    """
+    queue = asyncio.Queue(maxsize=max_buffered_lines)
+    processes = []
+    width = max((len(pod) for pod in pods), default=0)
+    tasks = []
+    for pod in pods:
+        command = ["kubectl", "logs", "-f", pod, "--context", kubecontext]
+        command += ["-n", namespace]
+        if container:
+            command += ["-c", container]
+        tasks.append(asyncio.create_task(_tail_pod(pod, command, queue, processes)))
+
+    remaining = len(tasks)
+    try:
+        while remaining:
+            pod, line = await queue.get()
+            if line is None:
+                remaining -= 1
+                continue
+            if log_filter is not None and log_filter.is_active():
+                line = log_filter.apply(line)
+                if line is None:
+                    continue
+            yield f"[{pod.ljust(width)}] {line}"
+    finally:
+        for task in tasks:
+            task.cancel()
+        for process in processes:
+            if process.returncode is None:
+                process.terminate()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.gather(
+            *(process.wait() for process in processes), return_exceptions=True
+        )
+
+
+def stream_pod_logs(pods, kubecontext, namespace, container=None, log_filter=None):
+    """Synchronous wrapper around aggregate_pod_logs for the Streamlit page."""
+    loop = asyncio.new_event_loop()
+    lines = aggregate_pod_logs(pods, kubecontext, namespace, container, log_filter)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(anext(lines))
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(lines.aclose())
+        loop.close()
+
+
+async def _kubectl_json(command, timeout):
+    """Runs a kubectl command that prints JSON; returns (data, error)."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=1024 * 1024,
+        )
+    except OSError as e:
+        return None, str(e)
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except TimeoutError:
+        process.kill()
+        await process.wait()
+        return None, "Error: Command timed out."
+    if process.returncode != 0:
+        return None, stderr.decode("utf-8", errors="replace").strip()
+    try:
+        return json.loads(stdout), None
+    except ValueError as e:
+        return None, f"Could not parse kubectl output: {e}"
+
+
+def _last_termination(pod):
+    """Returns the most recent container termination as 'reason (exit N) at time'."""
+    latest = None
+    for status in pod.get("status", {}).get("containerStatuses", []):
+        for state_key in ("lastState", "state"):
+            terminated = status.get(state_key, {}).get("terminated")
+            if terminated and (
+                latest is None
+                or terminated.get("finishedAt", "") > latest.get("finishedAt", "")
+            ):
+                latest = terminated
+    if latest is None:
+        return ""
+    reason = latest.get("reason") or "Terminated"
+    return (
+        f"{reason} (exit {latest.get('exitCode')}) at {latest.get('finishedAt', '?')}"
+    )
+
+
+def _pod_report(context, pod, warnings, max_warnings):
+    statuses = pod.get("status", {}).get("containerStatuses", [])
+    ready = sum(1 for status in statuses if status.get("ready"))
+    warnings = sorted(
+        warnings,
+        key=lambda event: event.get("lastTimestamp") or event.get("eventTime") or "",
+        reverse=True,
+    )[:max_warnings]
+    return {
+        "context": context,
+        "pod": pod["metadata"]["name"],
+        "phase": pod.get("status", {}).get("phase", ""),
+        "ready": f"{ready}/{len(statuses)}",
+        "restarts": sum(status.get("restartCount", 0) for status in statuses),
+        "last_termination": _last_termination(pod),
+        "recent_warnings": " | ".join(
+            f"{event.get('reason')}: {event.get('message', '').strip()}"
+            f" (x{event.get('count') or 1})"
+            for event in warnings
+        ),
+    }
+
+
+async def _diagnose_context(
+    context, namespace, pod_names, selector, max_warnings, timeout
+):
+    """Two kubectl calls per context: all pods and all Warning events in the namespace."""
+    base = ["kubectl", "--context", context, "-n", namespace]
+    (pods, pods_error), (events, events_error) = await asyncio.gather(
+        _kubectl_json(base + ["get", "pods", "-o", "json"], timeout),
+        _kubectl_json(
+            base + ["get", "events", "-o", "json", "--field-selector", "type=Warning"],
+            timeout,
+        ),
+    )
+    if pods_error:
+        return [], pods_error
+    warnings_by_pod = {}
+    for event in (events or {}).get("items", []):
+        involved = event.get("involvedObject", {})
+        if involved.get("kind") == "Pod":
+            warnings_by_pod.setdefault(involved.get("name"), []).append(event)
+
+    reports = []
+    for pod in pods.get("items", []):
+        name = pod["metadata"]["name"]
+        if name not in pod_names and not (selector and selector.search(name)):
+            continue
+        reports.append(
+            _pod_report(context, pod, warnings_by_pod.get(name, []), max_warnings)
+        )
+    return reports, events_error
+
+
+async def _diagnose_all(
+    contexts, namespace, pod_names, selector, max_warnings, timeout
+):
+    return await asyncio.gather(
+        *(
+            _diagnose_context(
+                context, namespace, pod_names, selector, max_warnings, timeout
+            )
+            for context in contexts
+        )
+    )
+
+
+def collect_pod_diagnostics(
+    contexts, namespace, pod_names=None, selector=None, max_warnings=3, timeout=60
+):
+    """
+    Builds a condensed report (phase, readiness, restarts, last termination,
+    recent Warning events) for the pods listed in pod_names or matching the
+    selector regex, across all contexts concurrently.
+
+    Returns (reports, errors) where errors maps context to an error message.
+    """
+    pod_names = set(pod_names or [])
+    selector = re.compile(selector) if selector else None
+    results = asyncio.run(
+        _diagnose_all(contexts, namespace, pod_names, selector, max_warnings, timeout)
+    )
+    reports, errors = [], {}
+    for context, (context_reports, error) in zip(contexts, results):
+        reports.extend(context_reports)
+        if error:
+            errors[context] = error
+    return reports, errors
@@ -0,0 +1,138 @@
+import re
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+TERM_PATTERN = re.compile(r"\w{2,}")
+WEEKDAY_NAMES = ["월", "화", "수", "목", "금", "토", "일"]
+
+
+def _day_number(timestamp: str) -> int:
+    return datetime.fromisoformat(timestamp).date().toordinal()
+
+
+class JournalAnalytics:
+    """
+    저널 항목의 통계를 API 호출 없이 계산합니다.
+
+    항목들을 열(column) 단위 배열로 들고 있어서 연속 기록, 요일/주 히트맵,
+    기간별 자주 쓴 단어를 배열 연산으로 한 번에 구합니다. 항목이 추가되면
+    배열 끝에 이어 붙이기만 합니다.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.days = np.zeros(0, dtype=np.int32)  # date.toordinal()
+        self.vocabulary: dict[str, int] = {}
+        self.terms: list[str] = []
+        # 단어 하나가 나올 때마다 (항목 행 번호, 단어 번호)를 한 줄씩 기록합니다.
+        self.token_rows = np.zeros(0, dtype=np.int32)
+        self.token_terms = np.zeros(0, dtype=np.int32)
+
+    def is_synced(self, entries: list) -> bool:
+        if len(entries) != len(self.ids):
+            return False
+        return set(self.ids.tolist()) == {entry["id"] for entry in entries}
+
+    def rebuild(self, entries: list):
+        self._reset()
+        self._append(entries)
+
+    def add(self, entry: dict):
+        self._append([entry])
+
+    def _append(self, entries: list):
+        if not entries:
+            return
+        first_row = len(self.ids)
+        token_rows, token_terms = [], []
+        for offset, entry in enumerate(entries):
+            for term in TERM_PATTERN.findall(entry["content"].lower()):
+                term_id = self.vocabulary.get(term)
+                if term_id is None:
+                    term_id = self.vocabulary[term] = len(self.terms)
+                    self.terms.append(term)
+                token_rows.append(first_row + offset)
+                token_terms.append(term_id)
+
+        self.ids = np.append(self.ids, [entry["id"] for entry in entries])
+        self.days = np.append(
+            self.days,
+            np.array([_day_number(e["timestamp"]) for e in entries], dtype=np.int32),
+        )
+        self.token_rows = np.append(
+            self.token_rows, np.array(token_rows, dtype=np.int32)
+        )
+        self.token_terms = np.append(
+            self.token_terms, np.array(token_terms, dtype=np.int32)
+        )
+
+    def streaks(self, today: date | None = None) -> dict:
+        """현재 연속 기록 일수와 최장 연속 기록 일수를 구합니다."""
+        if not len(self.days):
+            return {"current": 0, "longest": 0, "active_days": 0}
+        days = np.unique(self.days)
+        # 하루 간격이 끊기는 지점을 경계로 연속 구간을 나눕니다.
+        breaks = np.flatnonzero(np.diff(days) != 1)
+        starts = np.concatenate(([0], breaks + 1))
+        ends = np.concatenate((breaks, [len(days) - 1]))
+        lengths = ends - starts + 1
+
+        today = (today or date.today()).toordinal()
+        # 오늘 아직 기록하지 않았더라도 어제까지 이어졌다면 연속 기록으로 봅니다.
+        current = int(lengths[-1]) if days[-1] >= today - 1 else 0
+        return {
+            "current": current,
+            "longest": int(lengths.max()),
+            "active_days": len(days),
+        }
+
+    def daily_counts(self, days: int = 30, today: date | None = None) -> dict:
+        """최근 `days`일 동안의 날짜별 기록 수를 돌려줍니다."""
+        last = (today or date.today()).toordinal()
+        first = last - days + 1
+        in_range = (self.days >= first) & (self.days <= last)
+        counts = np.bincount(self.days[in_range] - first, minlength=days)
+        return {
+            date.fromordinal(first + offset).isoformat(): int(count)
+            for offset, count in enumerate(counts)
+        }
+
+    def weekly_heatmap(self, weeks: int = 12, today: date | None = None):
+        """
+        최근 `weeks`주의 요일(행) x 주(열) 기록 수 행렬과 각 주의 시작일을 돌려줍니다.
+        """
+        today = today or date.today()
+        last_monday = (today - timedelta(days=today.weekday())).toordinal()
+        first = last_monday - 7 * (weeks - 1)
+        in_range = (self.days >= first) & (self.days <= today.toordinal())
+        offsets = self.days[in_range] - first
+        heatmap = np.zeros((7, weeks), dtype=np.int32)
+        np.add.at(heatmap, (offsets % 7, offsets // 7), 1)
+        week_starts = [
+            date.fromordinal(first + 7 * week).isoformat() for week in range(weeks)
+        ]
+        return heatmap, week_starts
+
+    def top_terms(
+        self, start: date | None = None, end: date | None = None, limit: int = 10
+    ) -> list[tuple[str, int]]:
+        """기간 [start, end] 동안 가장 많이 쓴 단어와 횟수를 돌려줍니다."""
+        if not len(self.token_terms):
+            return []
+        row_mask = np.ones(len(self.days), dtype=bool)
+        if start is not None:
+            row_mask &= self.days >= start.toordinal()
+        if end is not None:
+            row_mask &= self.days <= end.toordinal()
+        terms = self.token_terms[row_mask[self.token_rows]]
+        if not len(terms):
+            return []
+        counts = np.bincount(terms, minlength=len(self.terms))
+        limit = min(limit, np.count_nonzero(counts))
+        top = np.argpartition(-counts, limit - 1)[:limit]
+        top = top[np.lexsort((top, -counts[top]))]
+        return [(self.terms[term_id], int(counts[term_id])) for term_id in top]
@@ -19,6 +19,14 @@ class MicroJournalController:
         """UI에 표시할 모든 저널 항목을 가져옵니다."""
         return self._service.get_all_entries()
 
+    def search_entries(self, query: str, top_k: int = 10) -> list:
+        """검색어와 비슷한 저널 항목을 가져옵니다."""
+        return self._service.search_entries(query, top_k)
+
+    def get_statistics(self) -> dict:
+        """기록 통계를 가져옵니다."""
+        return self._service.get_statistics()
+
     def get_weekly_summary(self) -> str:
         """주간 요약을 가져옵니다."""
         return self._service.get_summary(period="weekly")
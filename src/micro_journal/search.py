@@ -0,0 +1,122 @@
+import os
+import re
+import zlib
+
+import numpy as np
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def _features(text: str, ngram_range=(2, 3)) -> list[str]:
+    """
+    단어와 단어의 글자 n-gram을 특징으로 뽑습니다.
+    한국어는 조사가 붙어 단어 형태가 자주 바뀌므로 글자 n-gram이 더 잘 맞습니다.
+    """
+    features = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        features.append(word)
+        padded = f" {word} "
+        for n in range(ngram_range[0], ngram_range[1] + 1):
+            features.extend(padded[i : i + n] for i in range(len(padded) - n + 1))
+    return features
+
+
+def vectorize(text: str, dim: int) -> np.ndarray:
+    """텍스트를 해시된 로그 TF 벡터(float32)로 만듭니다."""
+    vector = np.zeros(dim, dtype=np.float32)
+    features = _features(text)
+    if not features:
+        return vector
+    # 파이썬 hash()는 실행마다 달라지므로 저장 가능한 crc32를 사용합니다.
+    buckets = np.fromiter(
+        (zlib.crc32(f.encode("utf-8")) % dim for f in features),
+        dtype=np.int64,
+        count=len(features),
+    )
+    counts = np.bincount(buckets, minlength=dim).astype(np.float32)
+    nonzero = counts > 0
+    vector[nonzero] = 1.0 + np.log(counts[nonzero])
+    return vector
+
+
+class JournalSearchIndex:
+    """
+    저널 항목을 로컬에서 검색하기 위한 해시 n-gram TF-IDF 인덱스
+
+    항목마다 TF 벡터 한 줄을 float32 행렬에 담아 .npz 파일로 저장합니다.
+    IDF는 문서 빈도(df)로 검색할 때 계산하므로 항목을 추가할 때 기존 행은
+    다시 계산할 필요가 없습니다.
+    """
+
+    def __init__(self, index_path: str, dim: int = 2048):
+        self.index_path = index_path
+        self.dim = dim
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.matrix = np.zeros((0, dim), dtype=np.float32)
+        self.df = np.zeros(dim, dtype=np.float32)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with np.load(self.index_path) as data:
+                if data["matrix"].shape[1] != self.dim:
+                    return
+                self.ids = data["ids"]
+                self.matrix = data["matrix"]
+                self.df = data["df"]
+        except (IOError, ValueError, KeyError) as e:
+            print(f"Error loading search index: {e}")
+
+    def _save(self):
+        tmp_path = self.index_path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(f, ids=self.ids, matrix=self.matrix, df=self.df)
+            os.replace(tmp_path, self.index_path)
+        except IOError as e:
+            print(f"Error saving search index: {e}")
+
+    def is_synced(self, entries: list) -> bool:
+        """인덱스가 주어진 항목들과 같은 id 집합을 담고 있는지 확인합니다."""
+        if len(entries) != len(self.ids):
+            return False
+        return set(self.ids.tolist()) == {entry["id"] for entry in entries}
+
+    def rebuild(self, entries: list):
+        """모든 항목으로 인덱스를 새로 만듭니다."""
+        self.ids = np.array([entry["id"] for entry in entries], dtype=np.int64)
+        self.matrix = np.zeros((len(entries), self.dim), dtype=np.float32)
+        for row, entry in enumerate(entries):
+            self.matrix[row] = vectorize(entry["content"], self.dim)
+        self.df = (self.matrix > 0).sum(axis=0).astype(np.float32)
+        self._save()
+
+    def add(self, entry: dict):
+        """항목 하나를 인덱스 끝에 추가합니다."""
+        vector = vectorize(entry["content"], self.dim)
+        self.ids = np.append(self.ids, np.int64(entry["id"]))
+        self.matrix = np.vstack([self.matrix, vector[np.newaxis, :]])
+        self.df += vector > 0
+        self._save()
+
+    def search(self, query: str, top_k: int = 10) -> list[tuple[int, float]]:
+        """코사인 유사도가 높은 순으로 (항목 id, 점수)를 돌려줍니다."""
+        if not len(self.ids):
+            return []
+        query_vector = vectorize(query, self.dim)
+        if not query_vector.any():
+            return []
+        idf = np.log((1.0 + len(self.ids)) / (1.0 + self.df)) + 1.0
+        weighted = self.matrix * idf
+        query_vector *= idf
+        norms = np.linalg.norm(weighted, axis=1) * np.linalg.norm(query_vector)
+        scores = (weighted @ query_vector) / np.maximum(norms, 1e-12)
+
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (int(self.ids[row]), float(scores[row])) for row in top if scores[row] > 0
+        ]
@@ -1,8 +1,76 @@
+import hashlib
 import json
 import os
 from datetime import datetime, timedelta
 from openai import OpenAI
 
+from common.prompt.service import complete_chat
+from common.prompt.template import PromptTemplate
+
+from .analytics import JournalAnalytics
+from .search import JournalSearchIndex
+
+SUMMARY_INSTRUCTIONS = """You are a helpful coaching assistant who provides insightful reflections based on journal entries.
+
+너는 나의 기록을 바탕으로 회고를 도와주는 코치야. 사용자가 보내는 일기들을 읽고 아래 항목을 생성해줘.
+
+1. 이번 {period}의 핵심 키워드 3개
+2. 주요 사건 요약 (2~3문장)
+3. 나의 감정 패턴 (긍정/부정/중립 비율 포함)
+4. 배운 점 혹은 깨달음 2가지
+5. 다음 {next_period}를 위한 한 줄 조언
+
+출력은 아래 형식으로 해줘:
+---
+**핵심 키워드:** ...
+**요약:** ...
+**감정 요약:** ...
+**배운 점:** ...
+**다음 주 조언:** ...
+---
+"""
+
+SUMMARY_UPDATE_TEMPLATE = """이전 회고:
+{previous_summary}
+
+새로 추가된 기록:
+{entries}
+
+이전 회고에 새로 추가된 기록을 반영해서 같은 형식으로 다시 작성해줘."""
+
+# 기간별로 고정된 지시문을 미리 만들어 두어 매 요청의 프롬프트 앞부분이 항상 같도록 합니다.
+SUMMARY_PROMPTS = {
+    "weekly": PromptTemplate(
+        SUMMARY_INSTRUCTIONS.format(period="주", next_period="주"), "{entries}"
+    ),
+    "monthly": PromptTemplate(
+        SUMMARY_INSTRUCTIONS.format(period="달", next_period="달"), "{entries}"
+    ),
+}
+# 새 기록만 추가된 경우에는 같은 지시문에 이전 회고와 새 기록만 보냅니다.
+SUMMARY_UPDATE_PROMPTS = {
+    "weekly": PromptTemplate(
+        SUMMARY_INSTRUCTIONS.format(period="주", next_period="주"),
+        SUMMARY_UPDATE_TEMPLATE,
+    ),
+    "monthly": PromptTemplate(
+        SUMMARY_INSTRUCTIONS.format(period="달", next_period="달"),
+        SUMMARY_UPDATE_TEMPLATE,
+    ),
+}
+
+
+def _hash_entries(entries) -> str:
+    """기록들의 id, 시각, 내용으로 해시를 만듭니다."""
+    digest = hashlib.sha256()
+    for entry in sorted(entries, key=lambda x: x["id"]):
+        digest.update(
+            json.dumps(
+                [entry["id"], entry["timestamp"], entry["content"]], ensure_ascii=False
+            ).encode("utf-8")
+        )
+    return digest.hexdigest()
+
 
 class MicroJournalService:
     """
@@ -15,6 +83,10 @@ class MicroJournalService:
         api_key: str | None = None,
     ):
         self.db_path = db_path
+        self.summary_path = os.path.splitext(db_path)[0] + "_summaries.json"
+        self.search_index_path = os.path.splitext(db_path)[0] + "_search.npz"
+        self._search_index = None
+        self._analytics = None
         self.client = OpenAI(api_key=api_key) if api_key else None
         self._initialize_db()
 
@@ -39,6 +111,61 @@ class MicroJournalService:
                 json.dump(entries, f, ensure_ascii=False, indent=4)
         except (IOError, json.JSONDecodeError) as e:
             print(f"Error adding entry: {e}")  # 실제 앱에서는 로깅으로 대체해야 합니다.
+            return
+
+        # 검색 인덱스에는 새 항목 한 줄만 추가합니다.
+        index = self._get_search_index(entries[:-1])
+        index.add(new_entry)
+        # 통계는 이미 계산해 둔 경우에만 이어 붙이고, 아니면 처음 조회할 때 만듭니다.
+        if self._analytics is not None and self._analytics.is_synced(entries[:-1]):
+            self._analytics.add(new_entry)
+
+    def _get_search_index(self, entries: list) -> JournalSearchIndex:
+        """검색 인덱스를 불러오고, 항목들과 맞지 않으면 새로 만듭니다."""
+        if self._search_index is None:
+            self._search_index = JournalSearchIndex(self.search_index_path)
+        if not self._search_index.is_synced(entries):
+            self._search_index.rebuild(entries)
+        return self._search_index
+
+    def get_statistics(self, weeks: int = 12, top_terms: int = 10) -> dict:
+        """연속 기록, 최근 30일 기록 수, 요일/주 히트맵, 이번 주/달에 자주 쓴 단어를 구합니다."""
+        entries = self.get_all_entries()
+        if self._analytics is None:
+            self._analytics = JournalAnalytics()
+        if not self._analytics.is_synced(entries):
+            self._analytics.rebuild(entries)
+
+        today = datetime.now().date()
+        heatmap, week_starts = self._analytics.weekly_heatmap(weeks, today)
+        return {
+            "total": len(entries),
+            "streaks": self._analytics.streaks(today),
+            "daily_counts": self._analytics.daily_counts(30, today),
+            "heatmap": heatmap,
+            "week_starts": week_starts,
+            "top_terms": {
+                "weekly": self._analytics.top_terms(
+                    today - timedelta(days=today.weekday()), today, top_terms
+                ),
+                "monthly": self._analytics.top_terms(
+                    today.replace(day=1), today, top_terms
+                ),
+            },
+        }
+
+    def search_entries(self, query: str, top_k: int = 10) -> list:
+        """질문과 비슷한 저널 항목을 유사도 순으로 가져옵니다. 각 항목에 score가 붙습니다."""
+        if not query or not query.strip():
+            return []
+        entries = self.get_all_entries()
+        entries_by_id = {entry["id"]: entry for entry in entries}
+        results = self._get_search_index(entries).search(query, top_k)
+        return [
+            {**entries_by_id[entry_id], "score": score}
+            for entry_id, score in results
+            if entry_id in entries_by_id
+        ]
 
     def get_all_entries(self) -> list:
         """모든 저널 항목을 최신순으로 가져옵니다."""
@@ -84,51 +211,68 @@ class MicroJournalService:
         if not relevant_entries:
             return f"이번 {period_name}에는 기록이 없습니다."
 
-        # 프롬프트 생성
-        entries_str = "\n".join([f"- {entry['content']}" for entry in relevant_entries])
-
-        base_prompt = """너는 나의 기록을 바탕으로 회고를 도와주는 코치야. 다음의 일기들을 읽고 아래 항목을 생성해줘.
+        # 같은 기간의 기록이 바뀌지 않았다면 저장된 요약을 그대로 돌려줍니다.
+        cache_key = f"{period}:{start_date.date().isoformat()}"
+        summaries = self._load_summaries()
+        cached = summaries.get(cache_key)
+        entries_hash = _hash_entries(relevant_entries)
+        if cached and cached["hash"] == entries_hash:
+            return cached["summary"]
 
-{entries}
-
-1. 이번 {period}의 핵심 키워드 3개
-2. 주요 사건 요약 (2~3문장)
-3. 나의 감정 패턴 (긍정/부정/중립 비율 포함)
-4. 배운 점 혹은 깨달음 2가지
-5. 다음 {next_period}를 위한 한 줄 조언
-
-출력은 아래 형식으로 해줘:
----
-**핵심 키워드:** ...
-**요약:** ...
-**감정 요약:** ...
-**배운 점:** ...
-**다음 주 조언:** ...
----
-"""
+        # 이전 요약 이후 새 기록만 추가되었다면 새 기록만 반영해서 요약을 갱신합니다.
+        new_entries = relevant_entries
+        prompt = SUMMARY_PROMPTS[period]
+        variables = {}
+        if cached:
+            cached_ids = set(cached["entry_ids"])
+            previous_entries = [e for e in relevant_entries if e["id"] in cached_ids]
+            if (
+                len(previous_entries) == len(cached_ids)
+                and _hash_entries(previous_entries) == cached["hash"]
+            ):
+                new_entries = [e for e in relevant_entries if e["id"] not in cached_ids]
+                prompt = SUMMARY_UPDATE_PROMPTS[period]
+                variables["previous_summary"] = cached["summary"]
 
-        if period == "weekly":
-            prompt = base_prompt.format(
-                entries=entries_str, period="주", next_period="주"
-            )
-        else:  # monthly
-            prompt = base_prompt.format(
-                entries=entries_str, period="달", next_period="달"
-            )
+        variables["entries"] = "\n".join(
+            [f"- {entry['content']}" for entry in reversed(new_entries)]
+        )
 
         try:
-            response = self.client.chat.completions.create(
+            response = complete_chat(
+                self.client,
+                prompt,
                 model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful coaching assistant who provides insightful reflections based on journal entries.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
+                feature="micro_journal.summary",
+                **variables,
             )
             summary = response.choices[0].message.content
-            return summary if summary else "AI로부터 요약을 생성하지 못했습니다."
+            if not summary:
+                return "AI로부터 요약을 생성하지 못했습니다."
         except Exception as e:
             print(f"Error calling OpenAI API: {e}")  # 실제 앱에서는 로깅으로 대체
             return "AI 요약 생성 중 오류가 발생했습니다. API 키와 네트워크 연결을 확인해주세요."
+
+        summaries[cache_key] = {
+            "hash": entries_hash,
+            "entry_ids": [entry["id"] for entry in relevant_entries],
+            "summary": summary,
+            "created_at": datetime.now().isoformat(),
+        }
+        self._save_summaries(summaries)
+        return summary
+
+    def _load_summaries(self) -> dict:
+        """저장된 요약들을 {"기간:시작일": {...}} 형태로 불러옵니다."""
+        try:
+            with open(self.summary_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (IOError, json.JSONDecodeError):
+            return {}
+
+    def _save_summaries(self, summaries: dict):
+        try:
+            with open(self.summary_path, "w", encoding="utf-8") as f:
+                json.dump(summaries, f, ensure_ascii=False, indent=4)
+        except IOError as e:
+            print(f"Error saving summary: {e}")
@@ -3,7 +3,6 @@ import os
 import streamlit as st
 
 from english_writing.controller import AppController
-from english_writing.repository import FeedbackRepository
 from english_writing.service import QuestionService, FeedbackService
 
 
@@ -40,13 +39,52 @@ if "controller" not in st.session_state:
 if "question" not in st.session_state:
     st.session_state.question = st.session_state.controller.get_question()
 
-# Load feedback history from the database
-if "past_feedbacks" not in st.session_state:
-    feedback_repo = FeedbackRepository()
-    # Fetch all feedback records and sort by most recent
-    history = feedback_repo.get_all()
-    sorted_history = sorted(history, key=lambda x: x.timestamp, reverse=True)
-    st.session_state.past_feedbacks = [item.feedback for item in sorted_history]
+
+def load_feedback_history():
+    """
+    Loads the latest page of feedback, optionally only for the current question.
+    """
+    question = st.session_state.question
+    question_id = (
+        question["id"]
+        if question and st.session_state.get("history_this_question")
+        else None
+    )
+    rows, cursor = st.session_state.controller.get_feedback_page(
+        question_id=question_id
+    )
+    st.session_state.feedback_history = {
+        "rows": rows,
+        "cursor": cursor,
+        "total": st.session_state.controller.count_feedback(question_id),
+        "question_id": question_id,
+    }
+
+
+def load_older_feedback():
+    history = st.session_state.feedback_history
+    if history["cursor"] is not None:
+        rows, cursor = st.session_state.controller.get_feedback_page(
+            history["cursor"], history["question_id"]
+        )
+        history["rows"] = history["rows"] + rows
+        history["cursor"] = cursor
+
+
+def next_question():
+    """
+    Moves to the next scheduled question and clears the answer box.
+    """
+    st.session_state.question = st.session_state.controller.next_question()
+    st.session_state.answer = ""
+    st.session_state.last_feedback = None
+    if st.session_state.get("history_this_question"):
+        load_feedback_history()
+
+
+# Load the latest page of feedback history from the database
+if "feedback_history" not in st.session_state:
+    load_feedback_history()
 
 # --- 3. UI Rendering ---
 st.set_page_config(page_title="AI English Writing", layout="wide")
@@ -97,8 +135,20 @@ with main_col:
     else:
         current_question = st.session_state.question["question"]
 
-        st.subheader("Question")
+        question_header, next_button_col = st.columns([3, 1])
+        with question_header:
+            st.subheader("Question")
+        with next_button_col:
+            st.button("Next question", on_click=next_question, use_container_width=True)
         st.info(current_question)
+        progress = controller.get_question_progress(st.session_state.question["id"])
+        if progress:
+            score = progress["last_score"]
+            st.caption(
+                f"Attempts: {progress['attempt_count']} · "
+                f"Last attempt: {progress['last_attempt_at']:%Y-%m-%d %H:%M}"
+                + (f" · Last score: {score}/10" if score is not None else "")
+            )
 
         user_answer = st.text_area(
             "Write your English answer here:", height=200, key="answer"
@@ -111,20 +161,43 @@ with main_col:
                 st.warning("Please write an answer first.")
             else:
                 with st.spinner("AI is generating feedback... Please wait."):
-                    feedback = controller.process_answer_and_get_feedback(
-                        current_question, user_answer
+                    st.session_state.last_feedback = (
+                        controller.process_answer_and_get_feedback(
+                            st.session_state.question, user_answer
+                        )
                     )
-                    # Add new feedback to the top of the list and rerun
-                    if feedback:
-                        st.session_state.past_feedbacks.insert(0, feedback)
+                    # Reload the latest page so the new feedback is on top
+                    load_feedback_history()
                     st.rerun()
 
+        if st.session_state.get("last_feedback"):
+            st.markdown(st.session_state.last_feedback)
+
 with history_col:
-    if st.session_state.past_feedbacks:
-        st.subheader("Feedback History")
-        for i, feedback_item in enumerate(st.session_state.past_feedbacks):
-            # Show the latest feedback expanded by default
-            with st.expander(
-                f"Record #{len(st.session_state.past_feedbacks) - i}", expanded=i == 0
-            ):
-                st.markdown(feedback_item)
+    history = st.session_state.feedback_history
+    st.subheader("Feedback History")
+    st.checkbox(
+        "Only this question",
+        key="history_this_question",
+        on_change=load_feedback_history,
+    )
+    for i, feedback_item in enumerate(history["rows"]):
+        # Show the latest feedback expanded by default
+        with st.expander(f"Record #{history['total'] - i}", expanded=i == 0):
+            st.markdown(feedback_item.feedback)
+    if history["cursor"] is not None:
+        st.button("Load older", on_click=load_older_feedback)
+
+with st.expander("Import questions / memos"):
+    import_kind = st.radio("Import as", ["questions", "memos"], horizontal=True)
+    uploaded_file = st.file_uploader(
+        "One per line (.txt), a CSV with a question/memo/text column, or JSON Lines",
+        type=["txt", "csv", "jsonl"],
+    )
+    if uploaded_file is not None and st.button("Import"):
+        with st.spinner("Importing..."):
+            try:
+                inserted, skipped = controller.import_file(import_kind, uploaded_file)
+                st.success(f"Imported {inserted} {import_kind} ({skipped} duplicates).")
+            except ValueError as e:
+                st.error(f"Import failed: {e}")
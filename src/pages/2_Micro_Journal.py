@@ -1,6 +1,8 @@
 import streamlit as st
 import os
+import pandas as pd
 from dotenv import load_dotenv
+from micro_journal.analytics import WEEKDAY_NAMES
 from micro_journal.service import MicroJournalService
 from micro_journal.controller import MicroJournalController
 
@@ -96,9 +98,17 @@ with summary_col:
 
 with history_col:
     st.subheader("나의 모든 기록")
-    all_entries = controller.get_entries_for_display()
+    search_query = st.text_input(
+        "기록 검색", placeholder="비슷한 기록 찾기...", key="entry_search"
+    )
+    if search_query.strip():
+        all_entries = controller.search_entries(search_query)
+    else:
+        all_entries = controller.get_entries_for_display()
 
-    if not all_entries:
+    if search_query.strip() and not all_entries:
+        st.info("비슷한 기록을 찾지 못했습니다.")
+    elif not all_entries:
         st.info("아직 기록된 내용이 없습니다. 첫 기록을 남겨보세요!")
     else:
         with st.container(height=500):
@@ -109,3 +119,42 @@ with history_col:
                     st.caption(date_str)
                 with col2:
                     st.markdown(f"- {entry['content']}")
+
+st.divider()
+
+# --- 기록 통계 (API 호출 없이 로컬에서 계산) --- #
+st.subheader("기록 통계")
+stats = controller.get_statistics()
+
+metric_cols = st.columns(4)
+metric_cols[0].metric("전체 기록", stats["total"])
+metric_cols[1].metric("기록한 날", stats["streaks"]["active_days"])
+metric_cols[2].metric("현재 연속 기록", f"{stats['streaks']['current']}일")
+metric_cols[3].metric("최장 연속 기록", f"{stats['streaks']['longest']}일")
+
+daily_col, heatmap_col = st.columns(2)
+with daily_col:
+    st.caption("최근 30일 기록 수")
+    st.bar_chart(pd.Series(stats["daily_counts"], name="기록 수"))
+with heatmap_col:
+    st.caption("요일 x 주 기록 수 (열: 주 시작일)")
+    st.dataframe(
+        pd.DataFrame(
+            stats["heatmap"],
+            index=WEEKDAY_NAMES,
+            columns=[week[5:] for week in stats["week_starts"]],
+        ),
+        use_container_width=True,
+    )
+
+week_terms_col, month_terms_col = st.columns(2)
+for col, label, terms in (
+    (week_terms_col, "이번 주 자주 쓴 단어", stats["top_terms"]["weekly"]),
+    (month_terms_col, "이번 달 자주 쓴 단어", stats["top_terms"]["monthly"]),
+):
+    with col:
+        st.caption(label)
+        if terms:
+            st.bar_chart(pd.Series(dict(terms), name="횟수"), horizontal=True)
+        else:
+            st.info("아직 기록이 없습니다.")
@@ -1,9 +1,14 @@
+import time
+
+import pandas as pd
 import streamlit as st
 from wordive.controller import (
+    SEARCH_DEBOUNCE_SECONDS,
     WordListController,
     WordDetailController,
     WordImportController,
     WritingPracticeQuizController,
+    ProgressController,
 )
 
 
@@ -18,9 +23,21 @@ if "word_import_controller" not in st.session_state:
 if "quiz_controller" not in st.session_state:
     st.session_state.quiz_controller = WritingPracticeQuizController()
 
+if "progress_controller" not in st.session_state:
+    st.session_state.progress_controller = ProgressController()
+
 if "selected_word_id" not in st.session_state:
     st.session_state.selected_word_id = None
 
+if "word_cursors" not in st.session_state:
+    # Cursor of every word-list page visited; the last one is the current page.
+    st.session_state.word_cursors = [None]
+
+if "word_search_applied" not in st.session_state:
+    # Query the word list currently shows and when the search box last changed.
+    st.session_state.word_search_applied = ""
+    st.session_state.word_search_changed_at = 0.0
+
 if "show_add_modal" not in st.session_state:
     st.session_state.show_add_modal = False
 
@@ -33,9 +50,13 @@ if "quiz_submitted" not in st.session_state:
 if "quiz_user_answer" not in st.session_state:
     st.session_state.quiz_user_answer = ""
 
+if "quiz_score" not in st.session_state:
+    st.session_state.quiz_score = None
+
 controller: WordListController = st.session_state.word_list_controller
 import_controller: WordImportController = st.session_state.word_import_controller
 quiz_controller: WritingPracticeQuizController = st.session_state.quiz_controller
+progress_controller: ProgressController = st.session_state.progress_controller
 
 if st.session_state.selected_word_id is None:
     st.title("📚 Wordive")
@@ -69,9 +90,10 @@ if st.session_state.selected_word_id is None:
             with col1:
                 if st.button("Submit", key="quiz_submit", use_container_width=True):
                     if user_answer.strip():
-                        quiz_controller.save_quiz_attempt(
+                        attempt = quiz_controller.save_quiz_attempt(
                             current_practice.id, user_answer
                         )
+                        st.session_state.quiz_score = attempt.score
                         st.session_state.quiz_user_answer = user_answer
                         st.session_state.quiz_submitted = True
                         st.rerun()
@@ -92,6 +114,8 @@ if st.session_state.selected_word_id is None:
             st.write(st.session_state.quiz_user_answer)
             st.write("**Correct answer:**")
             st.success(f"🇬🇧 {current_practice.english_answer}")
+            if st.session_state.quiz_score is not None:
+                st.metric("Score", f"{st.session_state.quiz_score:.0%}")
 
             if st.button("🔄 Another Practice", key="quiz_another_after"):
                 practice = quiz_controller.get_random_practice()
@@ -105,17 +129,93 @@ if st.session_state.selected_word_id is None:
             "No writing practices available. Please add words with writing practices first."
         )
 
+    # Progress dashboard (reads only the daily rollups)
+    st.markdown("---")
+    st.subheader("📈 Progress")
+    dashboard = progress_controller.get_dashboard(days=30)
+    if not dashboard["total_attempts"]:
+        st.info("No attempts yet. Your progress will show up here.")
+    else:
+        metric_cols = st.columns(4)
+        metric_cols[0].metric("Today", dashboard["today_attempts"])
+        metric_cols[1].metric("Total attempts", dashboard["total_attempts"])
+        metric_cols[2].metric("Active days", dashboard["active_days"])
+        metric_cols[3].metric(
+            "Average score",
+            f"{dashboard['accuracy']:.0%}"
+            if dashboard["accuracy"] is not None
+            else "-",
+        )
+
+        daily = pd.DataFrame(dashboard["daily"]).set_index("day")
+        chart_col, words_col = st.columns([1, 1])
+        with chart_col:
+            st.caption("Attempts in the last 30 days")
+            st.bar_chart(daily["attempts"])
+        with words_col:
+            st.caption("Words practised in the last 30 days")
+            st.dataframe(
+                pd.DataFrame(dashboard["words"][:10]),
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "accuracy": st.column_config.ProgressColumn(
+                        "Score", min_value=0.0, max_value=1.0, format="percent"
+                    ),
+                    "last_attempt_at": st.column_config.DatetimeColumn(
+                        "Last attempt", format="YYYY-MM-DD HH:mm"
+                    ),
+                },
+            )
+
     st.markdown("---")
 
     col1, col2 = st.columns([3, 1])
     with col1:
         search_query = st.text_input(
-            "Search words", placeholder="Enter a word to search..."
+            "Search words",
+            placeholder="Type at least 2 letters to search...",
+            key="word_search",
+            on_change=lambda: st.session_state.update(
+                word_search_changed_at=time.monotonic()
+            ),
         )
     with col2:
         if st.button("➕ Add New Word", use_container_width=True):
             st.session_state.show_add_modal = True
 
+    with st.expander("Import / Export deck"):
+        deck_file = st.file_uploader(
+            "Import an Anki-style deck (.tsv or .csv)", type=["tsv", "txt", "csv"]
+        )
+        merge_deck = st.checkbox(
+            "Merge: make existing words match the deck",
+            key="deck_merge",
+            help="Updates changed rows and deletes rows missing from the deck. "
+            "Practices you have attempted are kept.",
+        )
+        if deck_file and st.button(
+            "Import deck", key="deck_import", use_container_width=True
+        ):
+            try:
+                with st.spinner("Importing deck..."):
+                    created, updated = import_controller.import_deck(
+                        deck_file, merge_deck
+                    )
+                controller.clear_cache()
+                st.success(f"Imported {created} new words, updated {updated}.")
+            except ValueError as e:
+                st.error(f"Import failed: {e}")
+
+        deck_format = st.radio("Export format", ["tsv", "csv"], horizontal=True)
+        if st.button("Prepare export", key="deck_export", use_container_width=True):
+            st.download_button(
+                "Download",
+                data=import_controller.export_deck(deck_format),
+                file_name=f"wordive_deck.{deck_format}",
+                use_container_width=True,
+            )
+
     # Add word modal
     if st.session_state.show_add_modal:
         with st.container():
@@ -155,14 +255,20 @@ if st.session_state.selected_word_id is None:
                 height=300,
                 key="json_input",
             )
+            merge_json = st.checkbox(
+                "Merge into the word if it already exists", key="json_merge"
+            )
 
             col1, col2 = st.columns([1, 1])
             with col1:
                 if st.button("✅ Import", use_container_width=True):
                     if json_input.strip():
                         try:
-                            word = import_controller.import_word_from_json(json_input)
+                            word = import_controller.import_word_from_json(
+                                json_input, merge_json
+                            )
                             st.success(f"Successfully imported word: {word.word}")
+                            controller.clear_cache()
                             st.session_state.show_add_modal = False
                             if "json_input" in st.session_state:
                                 del st.session_state.json_input
@@ -180,17 +286,54 @@ if st.session_state.selected_word_id is None:
                         del st.session_state.json_input
                     st.rerun()
 
-    words = controller.get_words(search_query if search_query else None)
+    # Debounce: keep showing the previous results until the query has been
+    # left alone for SEARCH_DEBOUNCE_SECONDS, then search once.
+    search_wait = 0.0
+    if search_query != st.session_state.word_search_applied:
+        search_wait = SEARCH_DEBOUNCE_SECONDS - (
+            time.monotonic() - st.session_state.word_search_changed_at
+        )
+        if search_wait <= 0:
+            st.session_state.word_search_applied = search_query
+            st.session_state.word_cursors = [None]
+
+    words, next_cursor = controller.get_words_page(
+        st.session_state.word_search_applied, st.session_state.word_cursors[-1]
+    )
 
     if not words:
         st.info("No words found. Please add words to the database.")
     else:
-        st.subheader(f"Words ({len(words)})")
+        st.subheader(f"Words (page {len(st.session_state.word_cursors)})")
 
         for word in words:
             if st.button(word.word, key=f"word_{word.id}", use_container_width=True):
                 st.session_state.selected_word_id = word.id
                 st.rerun()
+
+    prev_col, next_col = st.columns([1, 1])
+    with prev_col:
+        if st.button(
+            "← Prev",
+            key="words_prev",
+            disabled=len(st.session_state.word_cursors) == 1,
+            use_container_width=True,
+        ):
+            st.session_state.word_cursors.pop()
+            st.rerun()
+    with next_col:
+        if st.button(
+            "Next →",
+            key="words_next",
+            disabled=next_cursor is None,
+            use_container_width=True,
+        ):
+            st.session_state.word_cursors.append(next_cursor)
+            st.rerun()
+
+    if search_wait > 0:
+        time.sleep(search_wait)
+        st.rerun()
 else:
     if "word_detail_controller" not in st.session_state:
         st.session_state.word_detail_controller = WordDetailController()
@@ -241,8 +384,12 @@ else:
 
                         if st.button("Submit", key=f"submit_{practice.id}"):
                             if user_answer.strip():
-                                detail_controller.save_attempt(practice.id, user_answer)
-                                st.success("Your attempt has been saved!")
+                                attempt = detail_controller.save_attempt(
+                                    practice.id, user_answer
+                                )
+                                st.success(
+                                    f"Your attempt has been saved! Score: {attempt.score:.0%}"
+                                )
                                 st.write("**Answer:**")
                                 st.info(practice.english_answer)
                             else:
@@ -1,3 +1,4 @@
+import re
 import streamlit as st
 from k8s_command_runner.controller import (
     initialize_session_state,
@@ -5,10 +6,27 @@ from k8s_command_runner.controller import (
     get_pods_logic,
     handle_pod_specific_commands,
     run_specific_command,
+    tail_matching_pods,
+    update_log_filter,
+    stop_log_stream,
     parse_pod_info,
-    CONTEXT_MAP,
-    ENVS,
+    poll_pods_job,
+    get_jobs,
+    has_running_jobs,
+    cancel_job,
+    clear_finished_jobs,
+    get_captures,
+    get_capture_page,
+    search_capture,
+    get_context_map,
+    probe_environment,
+    describe_context,
+    get_cached_pod_names,
+    run_batch_diagnostics,
 )
+from datetime import datetime, timedelta
+
+from k8s_command_runner.service import LOG_LEVELS
 
 
 def main_page():
@@ -16,6 +34,8 @@ def main_page():
     st.title("K8s Command Runner")
 
     initialize_session_state()
+    update_callbacks()
+    context_map = get_context_map()
 
     # --- User Input Section ---
     st.header("Get Pods")
@@ -23,17 +43,23 @@ def main_page():
     col1, col2, col3, col4, col5 = st.columns([1, 1, 2, 2, 2])
     with col1:
         env = st.selectbox(
-            "Environment", ENVS, key="selected_env", on_change=update_callbacks
+            "Environment",
+            list(context_map.keys()),
+            key="selected_env",
+            on_change=update_callbacks,
         )
     with col2:
-        region_options = list(CONTEXT_MAP[env].keys())
+        region_options = list(context_map[env].keys())
         region = st.selectbox(
             "Region", region_options, key="selected_region", on_change=update_callbacks
         )
     with col3:
-        context_options = CONTEXT_MAP[env][region]
+        context_options = context_map[env][region]
         kubecontext = st.selectbox(
-            "Kubernetes Context", context_options, key="kubecontext"
+            "Kubernetes Context",
+            context_options,
+            key="kubecontext",
+            format_func=describe_context,
         )
     with col4:
         namespace = st.text_input("Namespace", "debezium", key="namespace")
@@ -41,7 +67,31 @@ def main_page():
         grep_filter = st.text_input("Filter pods using | grep", key="grep_filter")
 
     # --- Command Execution ---
-    cmd_col, btn_col = st.columns([5, 1])
+    cmd_col, probe_col, btn_col = st.columns([4, 1, 1])
+    with probe_col:
+        st.write("")
+        if st.button("Probe Clusters", use_container_width=True):
+            with st.spinner(f"Probing every {env} context..."):
+                health = probe_environment(env)
+            with cmd_col:
+                unreachable = [h for h in health.values() if not h.reachable]
+                st.dataframe(
+                    [
+                        {
+                            "context": h.context,
+                            "status": h.describe(),
+                            "error": h.error or "",
+                        }
+                        for h in sorted(
+                            health.values(),
+                            key=lambda h: (not h.reachable, h.latency_ms or 0),
+                        )
+                    ],
+                    use_container_width=True,
+                    hide_index=True,
+                )
+                if unreachable:
+                    st.warning(f"{len(unreachable)} context(s) are unreachable.")
     with btn_col:
         st.write("")
         if st.button("Get Pods", use_container_width=True):
@@ -50,7 +100,10 @@ def main_page():
                 st.info(f"**Generated Command:** `{full_command_str}`")
 
     # --- Display Output ---
-    if st.session_state.error_info:
+    poll_pods_job()
+    if st.session_state.pods_job_id is not None:
+        st.info("Fetching pods in the background…")
+    elif st.session_state.error_info:
         st.error(st.session_state.error_info)
     elif st.session_state.pod_info:
         parse_pod_info(st.session_state.pod_info, grep_filter)
@@ -60,7 +113,7 @@ def main_page():
     # Bottom half: Command Execution
     st.header("Pod Specific Commands")
 
-    pod_name_col, logs_col, desc_col, stern_col = st.columns([4, 1, 1, 1])
+    pod_name_col, logs_col, desc_col, stern_col, tail_col = st.columns([4, 1, 1, 1, 1])
 
     with pod_name_col:
         st.text_input("Pod Name", key="pod_name", label_visibility="collapsed")
@@ -77,6 +130,10 @@ def main_page():
         if st.button("Stern", use_container_width=True, key="stern"):
             handle_pod_specific_commands(kubecontext, namespace)
 
+    with tail_col:
+        # Tails every cached pod whose name matches the Pod Name as a regex.
+        tail_clicked = st.button("Tail Matching", use_container_width=True)
+
     command_input_col, run_button_col = st.columns([5, 1])
     with command_input_col:
         st.text_input(
@@ -85,29 +142,221 @@ def main_page():
     with run_button_col:
         run_command_clicked = st.button("Run Command", use_container_width=True)
 
+    # --- Log Filters (applied to streamed output) ---
+    include_col, exclude_col, level_col, fields_col, capture_col = st.columns(
+        [2, 2, 1, 2, 1]
+    )
+    # Changing a filter updates the running stream without restarting it.
+    with include_col:
+        st.text_input("Include regex", key="log_include", on_change=update_log_filter)
+    with exclude_col:
+        st.text_input("Exclude regex", key="log_exclude", on_change=update_log_filter)
+    with level_col:
+        st.selectbox(
+            "Min level",
+            ["ALL"] + LOG_LEVELS,
+            key="log_min_level",
+            on_change=update_log_filter,
+        )
+    with fields_col:
+        st.text_input(
+            "JSON fields",
+            key="log_json_fields",
+            placeholder="e.g. logger,trace_id",
+            on_change=update_log_filter,
+        )
+    with capture_col:
+        st.write("")
+        st.checkbox("Capture to disk", key="capture_enabled")
+
     # --- Pod Specific Command Output ---
     # This section is now outside the column layout to ensure full width.
     if run_command_clicked:
-        stream_output = run_specific_command()
-        if stream_output:
-            log_output_area = st.empty()
-            full_log_output = ""
-            try:
-                for line in stream_output:
-                    full_log_output += line
-                    log_output_area.code(full_log_output, language="bash")
-            except Exception as e:
-                st.session_state.error = f"An error occurred during streaming: {e}"
+        run_specific_command()
+    elif tail_clicked:
+        tail_matching_pods(kubecontext, namespace)
 
     # Display output from 'Logs' or 'Describe' commands
     if st.session_state.output:
         st.code(st.session_state.output, language="bash")
 
-    # Display any errors
+    # Display any errors (e.g. an invalid filter pattern) above the stream.
     if st.session_state.error:
         st.subheader("Errors:")
         st.code(st.session_state.error, language="bash")
 
+    # Filled in last: the stream blocks the script while it runs, and
+    # everything else on the page should be on screen by then.
+    stream_area = st.container()
+
+    st.divider()
+    show_batch_diagnostics(context_map, env, kubecontext, namespace)
+
+    st.divider()
+    show_jobs()
+
+    st.divider()
+    show_captures()
+
+    with stream_area:
+        show_log_stream()
+
+
+def show_log_stream():
+    """The running log stream (or the output of the last one)."""
+    if st.session_state.log_stream is None:
+        if st.session_state.log_stream_output:
+            st.code(st.session_state.log_stream_output, language="bash")
+        return
+
+    st.button("Stop stream", key="stop_stream", on_click=stop_log_stream)
+    log_output_area = st.empty()
+    log_output_area.code(st.session_state.log_stream_output, language="bash")
+    try:
+        # A rerun interrupts this loop but leaves the stream open; the next
+        # run picks it up where this one stopped.
+        for line in st.session_state.log_stream:
+            st.session_state.log_stream_output += line
+            log_output_area.code(st.session_state.log_stream_output, language="bash")
+    except Exception as e:
+        st.session_state.error = f"An error occurred during streaming: {e}"
+        st.error(st.session_state.error)
+    st.session_state.log_stream = None
+
+
+def show_batch_diagnostics(context_map, env, kubecontext, namespace):
+    """Condensed describe/events report for many pods across contexts."""
+    st.header("Batch Diagnostics")
+    contexts_col, pods_col, selector_col, button_col = st.columns([2, 2, 2, 1])
+    with contexts_col:
+        contexts = st.multiselect(
+            "Contexts",
+            [context for names in context_map[env].values() for context in names],
+            default=[kubecontext],
+            key=f"diagnostics_contexts_{env}",
+        )
+    with pods_col:
+        pod_names = st.multiselect(
+            "Pods from the pod list", get_cached_pod_names(), key="diagnostics_pods"
+        )
+    with selector_col:
+        selector = st.text_input("or selector regex", key="diagnostics_selector")
+    with button_col:
+        st.write("")
+        if st.button("Diagnose", use_container_width=True):
+            with st.spinner(
+                f"Collecting diagnostics from {len(contexts)} context(s)..."
+            ):
+                run_batch_diagnostics(contexts, namespace, pod_names, selector)
+
+    if st.session_state.diagnostics_error:
+        st.error(st.session_state.diagnostics_error)
+    if st.session_state.diagnostics is not None:
+        if st.session_state.diagnostics:
+            st.dataframe(
+                st.session_state.diagnostics, use_container_width=True, hide_index=True
+            )
+        else:
+            st.info("No pods matched.")
+
+
+def show_jobs():
+    """Background command output, refreshed every second while jobs are running."""
+    polling = has_running_jobs()
+
+    @st.fragment(run_every=1 if polling else None)
+    def jobs_fragment():
+        if poll_pods_job():
+            # The pod table lives outside this fragment.
+            st.rerun()
+
+        header_col, clear_col = st.columns([5, 1])
+        with header_col:
+            st.header("Jobs")
+        with clear_col:
+            if st.button("Clear finished", use_container_width=True):
+                clear_finished_jobs()
+                st.rerun(scope="fragment")
+
+        jobs = get_jobs()
+        if polling and not has_running_jobs():
+            # run_every is only re-evaluated on a full run; do one to stop polling.
+            st.rerun()
+        if not jobs:
+            st.info("Commands started with 'Run Command' run here in the background.")
+            return
+        for job in jobs:
+            status_col, cancel_col = st.columns([5, 1])
+            with status_col:
+                st.markdown(f"**#{job.id}** `{job.label}` — {job.status}")
+                st.caption(f"{job.elapsed:.1f}s")
+            with cancel_col:
+                if not job.done and st.button(
+                    "Cancel", key=f"cancel_job_{job.id}", use_container_width=True
+                ):
+                    cancel_job(job.id)
+                    st.rerun(scope="fragment")
+            if job.stdout:
+                st.code(job.stdout, language="bash")
+            if job.stderr:
+                st.code(job.stderr, language="bash")
+
+    jobs_fragment()
+
+
+def show_captures():
+    """Browse and search output captured to disk by 'Capture to disk'."""
+    st.header("Captures")
+    captures = get_captures()
+    if not captures:
+        st.info("No captures yet. Enable 'Capture to disk' before running a command.")
+        return
+
+    capture = st.selectbox(
+        "Capture",
+        captures,
+        format_func=lambda meta: f"{meta['started_at'][:19]} · {meta['command']}",
+        key="selected_capture",
+    )
+    pattern_col, since_col, until_col = st.columns([2, 1, 1])
+    with pattern_col:
+        pattern = st.text_input("Search regex", key="capture_pattern")
+    with since_col:
+        since = st.text_input(
+            "Since", key="capture_since", placeholder="YYYY-MM-DD HH:MM"
+        )
+    with until_col:
+        until = st.text_input(
+            "Until", key="capture_until", placeholder="YYYY-MM-DD HH:MM"
+        )
+
+    if pattern or since or until:
+        try:
+            since_dt = datetime.fromisoformat(since) if since else None
+            until_dt = datetime.fromisoformat(until) if until else None
+            if until_dt and len(until) <= 16:
+                # Make a minute-precision upper bound inclusive.
+                until_dt += timedelta(minutes=1)
+            lines = search_capture(capture["id"], pattern, since_dt, until_dt)
+        except (ValueError, re.error) as e:
+            st.error(f"Invalid search: {e}")
+            return
+        st.caption(f"{len(lines)} matching lines (showing at most 500)")
+    else:
+        page_size = 200
+        page = st.number_input("Page", min_value=0, step=1, key="capture_page")
+        lines, first_line, total_lines = get_capture_page(
+            capture["id"], int(page), page_size
+        )
+        st.caption(f"Lines {first_line}–{total_lines} available")
+
+    st.code(
+        "\n".join(
+            f"{datetime.fromtimestamp(ts):%H:%M:%S} {text}" for _, ts, text in lines
+        ),
+        language="bash",
+    )
+
 
 if __name__ == "__main__":
     main_page()
@@ -34,7 +34,7 @@ def show():
     if "selected_task_id" not in st.session_state:
         st.session_state.selected_task_id = None
         if st.session_state.tasks:
-            st.session_state.selected_task_id = st.session_state.tasks[-1].id
+            st.session_state.selected_task_id = st.session_state.tasks[0].id
 
     # --- Layout ---
     left_col, right_col = st.columns([1, 2])
@@ -46,15 +46,68 @@ def show():
             st.session_state.show_add_dialog = True
             st.rerun()
 
+        with st.expander("Import / Export"):
+            uploaded_file = st.file_uploader(
+                "Import tasks (.jsonl or .csv)", type=["jsonl", "csv"]
+            )
+            if uploaded_file and st.button("Import", use_container_width=True):
+                try:
+                    with st.spinner("Importing tasks..."):
+                        imported = controller.import_tasks(uploaded_file)
+                    st.success(f"Imported {imported} tasks.")
+                except ValueError as e:
+                    st.error(f"Import failed: {e}")
+
+            export_format = st.radio("Export format", ["jsonl", "csv"], horizontal=True)
+            if st.button("Prepare export", use_container_width=True):
+                st.download_button(
+                    "Download",
+                    data=controller.export_tasks(export_format),
+                    file_name=f"why_board_tasks.{export_format}",
+                    use_container_width=True,
+                )
+
+        search_col, filter_col = st.columns([2, 1])
+        with search_col:
+            st.text_input(
+                "Search",
+                key="task_search",
+                placeholder="Search by title",
+                on_change=controller.reset_task_page,
+            )
+        with filter_col:
+            st.selectbox(
+                "Status",
+                list(controller.COMPLETED_FILTERS),
+                key="task_completed_filter",
+                on_change=controller.reset_task_page,
+            )
+
         st.divider()
 
-        for task in reversed(st.session_state.tasks):
+        for task in st.session_state.tasks:
             if st.button(
                 task.title, key=f"task_btn_{task.id}", use_container_width=True
             ):
                 st.session_state.selected_task_id = task.id
                 st.rerun()
 
+        prev_col, next_col = st.columns(2)
+        with prev_col:
+            st.button(
+                "← Newer",
+                use_container_width=True,
+                disabled=not controller.has_previous_page(),
+                on_click=controller.previous_page,
+            )
+        with next_col:
+            st.button(
+                "Older →",
+                use_container_width=True,
+                disabled=not controller.has_next_page(),
+                on_click=controller.next_page,
+            )
+
     # --- Right Section: Task Details ---
     with right_col:
         st.header("Details")
@@ -62,14 +115,7 @@ def show():
         if st.session_state.selected_task_id is None:
             st.info("Select a task to see the details, or add a new one.")
         else:
-            selected_task = next(
-                (
-                    task
-                    for task in st.session_state.tasks
-                    if task.id == st.session_state.selected_task_id
-                ),
-                None,
-            )
+            selected_task = controller.get_task(st.session_state.selected_task_id)
 
             if selected_task:
                 st.subheader(selected_task.title)
@@ -80,20 +126,53 @@ def show():
 
                 st.divider()
 
-                if st.button("Get AI Suggestion", key=f"ai_btn_{selected_task.id}"):
+                single_col, multi_col = st.columns(2)
+                with single_col:
+                    single_clicked = st.button(
+                        "Get AI Suggestion",
+                        key=f"ai_btn_{selected_task.id}",
+                        use_container_width=True,
+                    )
+                with multi_col:
+                    multi_clicked = st.button(
+                        "Compare Suggestions from Several Models",
+                        key=f"ai_multi_btn_{selected_task.id}",
+                        use_container_width=True,
+                    )
+                if single_clicked:
                     with st.spinner("Generating AI suggestion..."):
                         controller.suggest_questions_by_ai(selected_task)
                         st.rerun()
+                if multi_clicked:
+                    with st.spinner("Waiting for the models..."):
+                        for (
+                            label,
+                            suggestion,
+                        ) in controller.suggest_questions_from_models(selected_task):
+                            st.info(f"**{label}**\n\n{suggestion}")
 
                 # --- AI Response History ---
-                ai_responses = controller.get_ai_responses_for_task(selected_task.id)
-                if ai_responses:
+                summaries, has_more = controller.get_ai_response_history(
+                    selected_task.id
+                )
+                if summaries:
                     st.subheader("AI Suggestion History")
-                    for i, response in enumerate(ai_responses):
-                        with st.expander(
-                            f"Suggestion {len(ai_responses) - i} ({response.created_at})"
+                    for summary in summaries:
+                        model = f" · {summary['model']}" if summary["model"] else ""
+                        # Full bodies are only fetched for the entries that are opened.
+                        if st.toggle(
+                            f"{summary['created_at']:%Y-%m-%d %H:%M}{model} — "
+                            f"{summary['first_line']}",
+                            key=f"ai_response_{summary['id']}",
                         ):
-                            st.info(response.ai_response)
+                            st.info(controller.get_ai_response_text(summary["id"]))
+                    if has_more:
+                        st.button(
+                            "Load older suggestions",
+                            key=f"ai_older_{selected_task.id}",
+                            on_click=controller.load_older_ai_responses,
+                            args=(selected_task.id,),
+                        )
             else:
                 st.warning("Selected task not found.")
                 st.session_state.selected_task_id = None
@@ -2,30 +2,167 @@ from typing import Sequence
 
 import streamlit as st
 
+from common.transfer.lines import spool_lines, upload_lines
+from why_board import transfer
 from why_board.models import AIResponse
 from why_board.service import task_service, ai_response_service
 
+TASKS_PER_PAGE = 20
+RESPONSES_PER_PAGE = 10
+COMPLETED_FILTERS = {"All": None, "Open": False, "Completed": True}
+
 
 def initialize_session_state():
     """
-    Initializes the database and loads tasks into the session state.
+    Initializes the database and loads the first page of tasks into the session state.
     """
+    if "task_search" not in st.session_state:
+        st.session_state.task_search = ""
+    if "task_completed_filter" not in st.session_state:
+        st.session_state.task_completed_filter = "All"
+    if "task_cursors" not in st.session_state:
+        # Cursor of every page visited so far; the last one is the current page.
+        st.session_state.task_cursors = [None]
     if "tasks" not in st.session_state:
-        st.session_state.tasks = task_service.get_all_tasks()
+        load_task_page()
+    else:
+        refresh_tasks()
+    if "ai_response_history" not in st.session_state:
+        st.session_state.ai_response_history = {}
+    if "ai_response_bodies" not in st.session_state:
+        st.session_state.ai_response_bodies = {}
     if "openai_api_key" not in st.session_state:
         st.session_state.openai_api_key = ""
 
 
+def load_task_page():
+    """
+    Loads the current window of tasks (newest first) into the session state.
+    """
+    # Read the version first so a write racing with the query is picked up
+    # by the next refresh_tasks() rather than lost.
+    st.session_state.task_version = task_service.get_data_version()
+    tasks, next_cursor = task_service.get_tasks_page(
+        TASKS_PER_PAGE,
+        cursor=st.session_state.task_cursors[-1],
+        completed=COMPLETED_FILTERS[st.session_state.task_completed_filter],
+        search=st.session_state.task_search.strip() or None,
+    )
+    st.session_state.tasks = tasks
+    st.session_state.tasks_by_id = {task.id: task for task in tasks}
+    st.session_state.next_task_cursor = next_cursor
+
+
+def _matches_filters(task):
+    completed = COMPLETED_FILTERS[st.session_state.task_completed_filter]
+    if completed is not None and task.completed != completed:
+        return False
+    search = st.session_state.task_search.strip().lower()
+    return not search or search in task.title.lower()
+
+
+def _in_current_window(task):
+    """Whether the task sorts between the current page's start and end cursors."""
+    key = (task.created_at, task.id)
+    start = st.session_state.task_cursors[-1]
+    end = st.session_state.next_task_cursor
+    return (start is None or key < start) and (end is None or key > end)
+
+
+def refresh_tasks():
+    """
+    Brings the current window up to date with writes made by other sessions,
+    re-reading only the tasks that changed since this session's version.
+    """
+    version, changed = task_service.get_changed_tasks(st.session_state.task_version)
+    if version == st.session_state.task_version:
+        return
+    if changed is None:
+        load_task_page()
+        return
+
+    window = {task.id: task for task in st.session_state.tasks}
+    for task in changed:
+        if _matches_filters(task) and _in_current_window(task):
+            window[task.id] = task
+        else:
+            window.pop(task.id, None)
+    tasks = sorted(window.values(), key=lambda t: (t.created_at, t.id), reverse=True)
+    if len(tasks) > TASKS_PER_PAGE:
+        tasks = tasks[:TASKS_PER_PAGE]
+        st.session_state.next_task_cursor = (tasks[-1].created_at, tasks[-1].id)
+    st.session_state.tasks = tasks
+    st.session_state.tasks_by_id = {task.id: task for task in tasks}
+    st.session_state.task_version = version
+
+
+def has_next_page():
+    return st.session_state.next_task_cursor is not None
+
+
+def has_previous_page():
+    return len(st.session_state.task_cursors) > 1
+
+
+def next_page():
+    if has_next_page():
+        st.session_state.task_cursors.append(st.session_state.next_task_cursor)
+        load_task_page()
+
+
+def previous_page():
+    if has_previous_page():
+        st.session_state.task_cursors.pop()
+        load_task_page()
+
+
+def reset_task_page():
+    """Goes back to the first page, e.g. after the filters changed."""
+    st.session_state.task_cursors = [None]
+    load_task_page()
+
+
+def get_task(task_id):
+    """
+    Looks up a task by id, from the current window if possible.
+    """
+    task = st.session_state.tasks_by_id.get(task_id)
+    if task is None:
+        task = task_service.get_task(task_id)
+    return task
+
+
 def add_task(title, description, why, how, caution):
     """
-    Adds a new task using the service and updates the session state.
+    Adds a new task using the service and shows the first page, where it appears.
     """
     new_task = task_service.add_task(title, description, why, how, caution)
     if new_task:
-        st.session_state.tasks.append(new_task)
+        reset_task_page()
     return new_task
 
 
+def import_tasks(uploaded_file):
+    """
+    Streams an uploaded .jsonl or .csv file into the database in batches.
+    """
+    file_format = "csv" if uploaded_file.name.lower().endswith(".csv") else "jsonl"
+    lines = upload_lines(uploaded_file)
+    try:
+        return transfer.import_file(lines, file_format)
+    finally:
+        # Batches before a failing line are committed either way.
+        reset_task_page()
+
+
+def export_tasks(file_format):
+    """
+    Writes all tasks to a temporary file and returns it, rewound.
+    """
+    lines = transfer.export_csv() if file_format == "csv" else transfer.export_jsonl()
+    return spool_lines(lines)
+
+
 def get_ai_responses_for_task(task_id) -> Sequence[AIResponse]:
     """
     Retrieves all AI responses for a given task_id from the service.
@@ -33,9 +170,53 @@ def get_ai_responses_for_task(task_id) -> Sequence[AIResponse]:
     return ai_response_service.get_responses_for_task(task_id)
 
 
+def get_ai_response_history(task_id):
+    """
+    Returns (summaries, has_more) for the task's AI responses: the latest
+    page is re-read on every call (cheap, indexed), older pages are kept in
+    the session once loaded and dropped when a newer response shows up.
+    """
+    latest, cursor = ai_response_service.get_response_summaries(
+        task_id, RESPONSES_PER_PAGE
+    )
+    top_id = latest[0]["id"] if latest else None
+    history = st.session_state.ai_response_history.get(task_id)
+    if history is None or history["top_id"] != top_id:
+        history = {"rows": latest, "cursor": cursor, "top_id": top_id}
+        st.session_state.ai_response_history[task_id] = history
+    return history["rows"], history["cursor"] is not None
+
+
+def load_older_ai_responses(task_id):
+    history = st.session_state.ai_response_history.get(task_id)
+    if history and history["cursor"] is not None:
+        older, cursor = ai_response_service.get_response_summaries(
+            task_id, RESPONSES_PER_PAGE, history["cursor"]
+        )
+        history["rows"] = history["rows"] + older
+        history["cursor"] = cursor
+
+
+def get_ai_response_text(response_id):
+    """
+    Loads (and caches) the full text of one AI response.
+    """
+    bodies = st.session_state.ai_response_bodies
+    if response_id not in bodies:
+        bodies[response_id] = ai_response_service.get_response_text(response_id)
+    return bodies[response_id]
+
+
 def suggest_questions_by_ai(task):
     return ai_response_service.suggest_question_by_ai(task)
 
 
+def suggest_questions_from_models(task):
+    """
+    Yields (model label, suggestion) from several models as they arrive.
+    """
+    return ai_response_service.stream_suggestions_from_models(task)
+
+
 # Initialize session state when the controller is imported
 initialize_session_state()
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 
-from sqlmodel import Field, Relationship, SQLModel, Column, Text
+from sqlmodel import Field, Relationship, SQLModel, Column, Index, Text
 
 
 class Task(SQLModel, table=True):
@@ -15,7 +15,9 @@ class Task(SQLModel, table=True):
     caution: Optional[str] = Field(default=None, sa_column=Column(Text))
     reflection: Optional[str] = Field(default=None, sa_column=Column(Text))
     completed: bool = Field(default=False)
-    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    created_at: datetime = Field(
+        default_factory=datetime.utcnow, nullable=False, index=True
+    )
 
     responses: List["AIResponse"] = Relationship(
         back_populates="task", sa_relationship_kwargs={"cascade": "all, delete-orphan"}
@@ -24,10 +26,14 @@ class Task(SQLModel, table=True):
 
 class AIResponse(SQLModel, table=True):
     __tablename__ = "why_board_ai_responses"
+    __table_args__ = (
+        Index("ix_why_board_ai_responses_task_id_created_at", "task_id", "created_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     task_id: Optional[int] = Field(default=None, foreign_key="why_board_tasks.id")
     ai_response: str = Field(sa_column=Column(Text))
+    model: Optional[str] = Field(default=None)
     created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
 
     task: Optional[Task] = Relationship(back_populates="responses")
@@ -1,14 +1,138 @@
+import threading
+from collections import deque
 from typing import Sequence
 
-from sqlmodel import Session, select
+from sqlmodel import Session, func, select
 from database import engine
 from .models import Task, AIResponse
 from common.repository.base import BaseRepository
 
 
+class TaskChangeLog:
+    """
+    Process-wide data version for tasks. Every write through TaskRepository
+    bumps the version and records which task changed, so a session that
+    remembers the version it loaded can tell whether it is stale with an
+    in-memory comparison and re-read only the changed rows.
+    """
+
+    def __init__(self, max_entries=1000):
+        self._lock = threading.Lock()
+        # (version, frozenset of task ids) per write, oldest first. Whole
+        # writes are evicted once they hold more than max_entries ids, so a
+        # version is either fully recorded or not at all.
+        self._changes = deque()
+        self._size = 0
+        self.max_entries = max_entries
+        self.version = 0
+
+    def record(self, task_id):
+        self.record_many([task_id])
+
+    def record_many(self, task_ids):
+        task_ids = frozenset(task_ids)
+        with self._lock:
+            self.version += 1
+            self._changes.append((self.version, task_ids))
+            self._size += len(task_ids)
+            while self._size > self.max_entries:
+                _, evicted = self._changes.popleft()
+                self._size -= len(evicted)
+
+    def changes_since(self, version):
+        """
+        Returns (current_version, changed_task_ids). The ids are None when
+        the log no longer reaches back to `version`.
+        """
+        with self._lock:
+            if version == self.version:
+                return self.version, set()
+            if not self._changes or self._changes[0][0] > version + 1:
+                return self.version, None
+            return self.version, set().union(
+                *(task_ids for change, task_ids in self._changes if change > version)
+            )
+
+
 class TaskRepository(BaseRepository):
     def __init__(self):
         super().__init__(Task)
+        self.change_log = TaskChangeLog()
+
+    def create(self, **kwargs):
+        task = super().create(**kwargs)
+        self.change_log.record(task.id)
+        return task
+
+    def update(self, id: int, **kwargs):
+        task = super().update(id, **kwargs)
+        if task:
+            self.change_log.record(task.id)
+        return task
+
+    def bulk_insert(self, records):
+        """
+        Inserts tasks together with their AI responses in one transaction.
+        `records` are dicts of Task fields plus a "responses" list of dicts
+        of AIResponse fields. Returns the number of tasks inserted.
+        """
+        with Session(engine) as session:
+            tasks = []
+            for record in records:
+                record = dict(record)
+                responses = record.pop("responses", None) or []
+                task = self.model(**record)
+                task.responses = [AIResponse(**response) for response in responses]
+                tasks.append(task)
+            session.add_all(tasks)
+            # Read the ids before commit() expires the objects, which would
+            # cost one refresh SELECT per task.
+            session.flush()
+            task_ids = [task.id for task in tasks]
+            session.commit()
+        self.change_log.record_many(task_ids)
+        return len(task_ids)
+
+    def iter_with_responses(self, batch_size=500):
+        """
+        Yields (task, responses) for every task in id order, reading
+        batch_size tasks and their responses per query so the whole table
+        is never held in memory.
+        """
+        last_id = 0
+        while True:
+            with Session(engine) as session:
+                tasks = session.exec(
+                    select(self.model)
+                    .where(self.model.id > last_id)
+                    .order_by(self.model.id)
+                    .limit(batch_size)
+                ).all()
+                if not tasks:
+                    return
+                responses = session.exec(
+                    select(AIResponse)
+                    .where(AIResponse.task_id.in_([task.id for task in tasks]))
+                    .order_by(AIResponse.created_at, AIResponse.id)
+                ).all()
+            by_task = {}
+            for response in responses:
+                by_task.setdefault(response.task_id, []).append(response)
+            for task in tasks:
+                yield task, by_task.get(task.id, [])
+            last_id = tasks[-1].id
+
+    def get_changed_since(self, version):
+        """
+        Returns (current_version, changed_tasks); changed_tasks is None when
+        the caller is too far behind and should reload everything.
+        """
+        current_version, task_ids = self.change_log.changes_since(version)
+        if not task_ids:
+            return current_version, None if task_ids is None else []
+        with Session(engine) as session:
+            statement = select(self.model).where(self.model.id.in_(task_ids))
+            return current_version, session.exec(statement).all()
 
     def add(self, title, description, why, how, caution):
         return self.create(
@@ -20,6 +144,29 @@ class TaskRepository(BaseRepository):
             statement = select(self.model).order_by(self.model.created_at)
             return session.exec(statement).all()
 
+    def get_tasks_page(self, limit=20, cursor=None, completed=None, search=None):
+        """
+        Returns one page of tasks, newest first, and the cursor for the next
+        page (None on the last page). The cursor is the (created_at, id) of
+        the last task on the page, so each page is a range scan on the
+        created_at index instead of an OFFSET.
+        """
+        with Session(engine) as session:
+            statement = select(self.model)
+            if completed is not None:
+                statement = statement.where(self.model.completed == completed)
+            if search:
+                statement = statement.where(self.model.title.ilike(f"%{search}%"))
+            statement = self._newest_first(
+                statement, self.model.created_at, cursor
+            ).limit(limit + 1)
+            tasks = session.exec(statement).all()
+
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            return tasks, (tasks[-1].created_at, tasks[-1].id)
+        return tasks, None
+
 
 class AIResponseRepository(BaseRepository):
     def __init__(self):
@@ -28,6 +175,17 @@ class AIResponseRepository(BaseRepository):
     def add(self, task_id, response):
         self.create(task_id=task_id, ai_response=response)
 
+    def add_many(self, task_id, responses):
+        """Stores several (model, response) pairs in a single transaction."""
+        with Session(engine) as session:
+            session.add_all(
+                [
+                    self.model(task_id=task_id, ai_response=response, model=model)
+                    for model, response in responses
+                ]
+            )
+            session.commit()
+
     def get_for_task(self, task_id) -> Sequence[AIResponse]:
         with Session(engine) as session:
             statement = (
@@ -37,6 +195,49 @@ class AIResponseRepository(BaseRepository):
             )
             return session.exec(statement).all()
 
+    def get_summaries_for_task(self, task_id, limit=10, cursor=None, preview_chars=200):
+        """
+        Returns lightweight summaries (id, created_at, model, first_line) of a
+        task's responses, newest first, plus the cursor for older ones (None
+        when there are no more). Only the first characters of each response
+        are read; use get_text() for the full body.
+        """
+        with Session(engine) as session:
+            statement = select(
+                self.model.id,
+                self.model.created_at,
+                self.model.model,
+                func.substr(self.model.ai_response, 1, preview_chars),
+            ).where(self.model.task_id == task_id)
+            statement = self._newest_first(
+                statement, self.model.created_at, cursor
+            ).limit(limit + 1)
+            rows = session.exec(statement).all()
+
+        summaries = [
+            {
+                "id": response_id,
+                "created_at": created_at,
+                "model": model,
+                "first_line": next(
+                    (line for line in (preview or "").splitlines() if line.strip()),
+                    "",
+                ),
+            }
+            for response_id, created_at, model, preview in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = (summaries[-1]["created_at"], summaries[-1]["id"])
+        return summaries, next_cursor
+
+    def get_text(self, response_id):
+        with Session(engine) as session:
+            statement = select(self.model.ai_response).where(
+                self.model.id == response_id
+            )
+            return session.exec(statement).first()
+
 
 task_repo = TaskRepository()
 ai_response_repo = AIResponseRepository()
@@ -1,10 +1,102 @@
+import asyncio
+import os
+import re
+from difflib import SequenceMatcher
 from typing import Sequence
 
+from common.prompt.service import acomplete_chat, complete_chat
+from common.prompt.template import PromptTemplate
 from why_board.models import AIResponse
 from why_board.repository import task_repo, ai_response_repo
 import streamlit as st
 import openai
 
+SUGGESTION_PROMPT = PromptTemplate(
+    instructions=(
+        "You are an expert project reviewer helping someone think deeply about their work.\n"
+        "You will be given a task and the current thoughts about it. "
+        "Based on this information, generate 3–5 highly specific and practical self-reflection questions "
+        "that directly relate to the details of this task. Avoid generic or philosophical questions. "
+        "Each question should help refine the clarity, completeness, or feasibility of the plan.\n\n"
+        "Format the output as a short numbered list of concise questions."
+    ),
+    variables_template=(
+        "The task is titled: '{title}'\n"
+        "Description: {description}\n\n"
+        "Current thoughts:\n"
+        "- Purpose (why): {why}\n"
+        "- Implementation plan (how): {how}\n"
+        "- Risks or cautions: {caution}"
+    ),
+)
+
+# "model:temperature" pairs, comma separated, e.g. "gpt-4o:0.7,gpt-4o-mini:1.0"
+DEFAULT_SUGGESTION_VARIANTS = "gpt-4o:0.7,gpt-4o:1.0,gpt-4o-mini:0.7"
+DUPLICATE_QUESTION_RATIO = 0.85
+QUESTION_PREFIX = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s*")
+
+
+def load_suggestion_variants():
+    """
+    Reads the model/temperature variants from WHY_BOARD_AI_MODELS. Malformed
+    entries are skipped with a warning.
+    """
+    variants = []
+    spec = os.getenv("WHY_BOARD_AI_MODELS") or DEFAULT_SUGGESTION_VARIANTS
+    for item in spec.split(","):
+        model, _, temperature = item.strip().partition(":")
+        if not model:
+            continue
+        try:
+            temperature = float(temperature) if temperature else 0.7
+        except ValueError:
+            temperature = None
+        if temperature is None or not 0 <= temperature <= 2:
+            st.warning(
+                f"Ignoring WHY_BOARD_AI_MODELS entry '{item.strip()}': "
+                "the temperature must be a number between 0 and 2."
+            )
+            continue
+        variants.append((model, temperature))
+    return variants
+
+
+def _split_questions(suggestion):
+    questions = []
+    for line in suggestion.splitlines():
+        question = QUESTION_PREFIX.sub("", line).strip()
+        if question:
+            questions.append(question)
+    return questions
+
+
+def _normalize_question(question):
+    return " ".join(re.findall(r"\w+", question.lower()))
+
+
+class QuestionDeduplicator:
+    """Drops questions that are near-identical to one already kept."""
+
+    def __init__(self, ratio=DUPLICATE_QUESTION_RATIO):
+        self.ratio = ratio
+        self._kept = []
+
+    def filter(self, suggestion):
+        """Returns the suggestion's new questions as a numbered list, or None."""
+        fresh = []
+        for question in _split_questions(suggestion):
+            normalized = _normalize_question(question)
+            if any(
+                SequenceMatcher(None, normalized, kept).ratio() >= self.ratio
+                for kept in self._kept
+            ):
+                continue
+            self._kept.append(normalized)
+            fresh.append(question)
+        if not fresh:
+            return None
+        return "\n".join(f"{i}. {question}" for i, question in enumerate(fresh, 1))
+
 
 class TaskService:
     def add_task(self, title, description, why, how, caution):
@@ -16,60 +108,144 @@ class TaskService:
     def get_all_tasks(self):
         return task_repo.get_all_tasks()
 
+    def get_task(self, task_id):
+        return task_repo.get(task_id)
+
+    def get_tasks_page(self, limit, cursor=None, completed=None, search=None):
+        return task_repo.get_tasks_page(limit, cursor, completed, search)
+
+    def get_data_version(self):
+        return task_repo.change_log.version
+
+    def get_changed_tasks(self, version):
+        return task_repo.get_changed_since(version)
+
 
 class AIResponseService:
     def suggest_question_by_ai(self, task):
         """
         Generates and saves an AI suggestion for a given task.
         """
-        suggestion = self._get_ai_suggestion(
-            task.title,
-            task.description,
-            task.why,
-            task.how,
-            task.caution,
-        )
+        suggestion = self._get_ai_suggestion(self._prompt_variables(task))
         if suggestion:
             ai_response_repo.add(task_id=task.id, response=suggestion)
             return suggestion
         return None
 
+    def stream_suggestions_from_models(self, task, variants=None):
+        """
+        Requests suggestions from several models/temperatures concurrently and
+        yields (model label, deduplicated suggestion) as each one arrives.
+        All of them are saved in one transaction once the last one is in.
+        Models that fail are reported with a warning as they finish.
+        """
+        if not st.session_state.get("openai_api_key"):
+            st.error("Please enter your OpenAI API key to get suggestions.")
+            return
+        variants = variants or load_suggestion_variants()
+        if not variants:
+            st.error("No valid models are configured in WHY_BOARD_AI_MODELS.")
+            return
+        prompt = self._prompt_variables(task)
+        deduplicator = QuestionDeduplicator()
+        results = []
+        failures = 0
+        loop = asyncio.new_event_loop()
+        suggestions = self._suggestions_as_completed(prompt, variants)
+        try:
+            while True:
+                try:
+                    label, suggestion, error = loop.run_until_complete(
+                        anext(suggestions)
+                    )
+                except StopAsyncIteration:
+                    break
+                if error:
+                    failures += 1
+                    st.warning(f"{label} failed: {error}")
+                    continue
+                suggestion = deduplicator.filter(suggestion)
+                if suggestion:
+                    results.append((label, suggestion))
+                    yield label, suggestion
+        finally:
+            loop.run_until_complete(suggestions.aclose())
+            loop.close()
+        if results:
+            ai_response_repo.add_many(task.id, results)
+        elif failures == len(variants):
+            st.error("An error occurred with the OpenAI API for every model.")
+
+    async def _suggestions_as_completed(self, prompt, variants):
+        client = openai.AsyncOpenAI(api_key=st.session_state.openai_api_key)
+        requests = [
+            asyncio.create_task(
+                self._request_suggestion(client, model, temperature, prompt)
+            )
+            for model, temperature in variants
+        ]
+        try:
+            for request in asyncio.as_completed(requests):
+                label, suggestion, error = await request
+                if suggestion or error:
+                    yield label, suggestion, error
+        finally:
+            for request in requests:
+                request.cancel()
+            await asyncio.gather(*requests, return_exceptions=True)
+            await client.close()
+
+    async def _request_suggestion(self, client, model, temperature, prompt):
+        """Returns (label, suggestion, error); exactly one of the last two is set."""
+        label = f"{model} (t={temperature})"
+        try:
+            response = await acomplete_chat(
+                client,
+                SUGGESTION_PROMPT,
+                model=model,
+                feature="why_board.suggestion",
+                temperature=temperature,
+                **prompt,
+            )
+            suggestion = (response.choices[0].message.content or "").strip()
+            return label, suggestion, None if suggestion else "empty response"
+        except Exception as e:
+            return label, None, str(e)
+
     def get_responses_for_task(self, task_id) -> Sequence[AIResponse]:
         return ai_response_repo.get_for_task(task_id)
 
-    def _get_ai_suggestion(self, task_title, task_description, why, how, caution):
+    def get_response_summaries(self, task_id, limit, cursor=None):
+        return ai_response_repo.get_summaries_for_task(task_id, limit, cursor)
+
+    def get_response_text(self, response_id):
+        return ai_response_repo.get_text(response_id)
+
+    def _prompt_variables(self, task):
+        return {
+            "title": task.title,
+            "description": task.description,
+            "why": task.why,
+            "how": task.how,
+            "caution": task.caution,
+        }
+
+    def _get_ai_suggestion(self, prompt):
         """
-        Generates AI suggestions for a given task.
+        Generates AI suggestions for the given prompt variables.
         """
         if not st.session_state.get("openai_api_key"):
             st.error("Please enter your OpenAI API key to get suggestions.")
             return None
         try:
             client = openai.OpenAI(api_key=st.session_state.openai_api_key)
-            prompt = (
-                f"You are an expert project reviewer helping someone think deeply about their work.\n"
-                f"The task is titled: '{task_title}'\n"
-                f"Description: {task_description}\n\n"
-                f"Current thoughts:\n"
-                f"- Purpose (why): {why}\n"
-                f"- Implementation plan (how): {how}\n"
-                f"- Risks or cautions: {caution}\n\n"
-                f"Based on this information, generate 3–5 highly specific and practical self-reflection questions "
-                f"that directly relate to the details of this task. Avoid generic or philosophical questions. "
-                f"Each question should help refine the clarity, completeness, or feasibility of the plan.\n\n"
-                f"Format the output as a short numbered list of concise questions."
-            )
-            response = client.chat.completions.create(
+            response = complete_chat(
+                client,
+                SUGGESTION_PROMPT,
                 model="gpt-4o",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    }
-                ],
-                n=1,
-                stop=None,
+                feature="why_board.suggestion",
                 temperature=0.7,
+                **prompt,
             )
             return response.choices[0].message.content.strip()
         except Exception as e:
@@ -0,0 +1,163 @@
+"""
+Bulk import/export of WhyBoard tasks and their AI responses as JSON Lines
+or CSV.
+
+    PYTHONPATH=src python -m why_board.transfer export board.jsonl
+    PYTHONPATH=src python -m why_board.transfer import board.jsonl
+"""
+
+import argparse
+import csv
+import json
+import sys
+from datetime import datetime
+from itertools import islice
+
+from common.transfer.lines import csv_lines
+from why_board.repository import task_repo
+
+TASK_FIELDS = [
+    "title",
+    "description",
+    "why",
+    "how",
+    "caution",
+    "reflection",
+    "completed",
+    "created_at",
+]
+RESPONSE_FIELDS = ["ai_response", "model", "created_at"]
+IMPORT_BATCH_SIZE = 500
+
+
+def _to_record(task, responses):
+    record = {field: getattr(task, field) for field in TASK_FIELDS}
+    record["created_at"] = task.created_at.isoformat()
+    record["responses"] = [
+        {
+            "ai_response": response.ai_response,
+            "model": response.model,
+            "created_at": response.created_at.isoformat(),
+        }
+        for response in responses
+    ]
+    return record
+
+
+def export_jsonl():
+    """Yields one JSON line per task, with its responses nested."""
+    for task, responses in task_repo.iter_with_responses():
+        yield json.dumps(_to_record(task, responses), ensure_ascii=False) + "\n"
+
+
+def _csv_rows():
+    yield TASK_FIELDS + ["responses"]
+    for task, responses in task_repo.iter_with_responses():
+        record = _to_record(task, responses)
+        record["responses"] = json.dumps(record["responses"], ensure_ascii=False)
+        yield [record[field] for field in TASK_FIELDS + ["responses"]]
+
+
+def export_csv():
+    """Yields CSV lines: one row per task, responses as a JSON array column."""
+    yield from csv_lines(_csv_rows())
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes")
+
+
+def _parse_datetime(value):
+    return datetime.fromisoformat(value) if value else datetime.utcnow()
+
+
+def _normalize_record(raw):
+    if not isinstance(raw, dict):
+        raise ValueError(f"Expected a task object, got {type(raw).__name__}")
+    if not raw.get("title"):
+        raise ValueError(f"Task without a title: {raw}")
+    record = {field: raw.get(field) or None for field in TASK_FIELDS}
+    record["completed"] = _parse_bool(raw.get("completed") or False)
+    record["created_at"] = _parse_datetime(raw.get("created_at"))
+    responses = raw.get("responses") or []
+    if isinstance(responses, str):
+        responses = json.loads(responses)
+    if not isinstance(responses, list) or not all(
+        isinstance(response, dict) for response in responses
+    ):
+        raise ValueError("responses must be a list of objects")
+    record["responses"] = [
+        {
+            "ai_response": response["ai_response"],
+            "model": response.get("model"),
+            "created_at": _parse_datetime(response.get("created_at")),
+        }
+        for response in responses
+    ]
+    return record
+
+
+def read_jsonl(lines):
+    for line_no, line in enumerate(lines, 1):
+        if line.strip():
+            try:
+                yield _normalize_record(json.loads(line))
+            except (ValueError, KeyError) as e:
+                raise ValueError(f"Line {line_no}: {e}")
+
+
+def read_csv(lines):
+    for row_no, row in enumerate(csv.DictReader(lines), 2):
+        try:
+            yield _normalize_record(row)
+        except (ValueError, KeyError) as e:
+            raise ValueError(f"Row {row_no}: {e}")
+
+
+def import_records(records, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Inserts records in batches, one transaction per batch. Returns the count.
+    Batches before an invalid record stay imported; the ValueError raised
+    for it says how many tasks that was.
+    """
+    imported = 0
+    records = iter(records)
+    try:
+        while batch := list(islice(records, batch_size)):
+            imported += task_repo.bulk_insert(batch)
+    except ValueError as e:
+        raise ValueError(f"{e} ({imported} tasks before it were imported)") from e
+    return imported
+
+
+def import_file(lines, file_format):
+    """Imports an iterable of text lines in "jsonl" or "csv" format."""
+    reader = read_csv if file_format == "csv" else read_jsonl
+    return import_records(reader(lines))
+
+
+def _format_from_path(path):
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+
+    file_format = _format_from_path(args.path)
+    if args.action == "export":
+        lines = export_csv() if file_format == "csv" else export_jsonl()
+        with open(args.path, "w", encoding="utf-8", newline="") as f:
+            f.writelines(lines)
+        print(f"Exported tasks to {args.path}")
+    else:
+        with open(args.path, "r", encoding="utf-8", newline="") as f:
+            print(f"Imported {import_file(f, file_format)} tasks from {args.path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,69 @@
+import time
+from collections import OrderedDict
 from typing import List, Optional
 
+from common.transfer.lines import spool_lines, upload_lines
+
+from . import transfer
+
 from .service import (
     WordService,
     WordDetailService,
     WordImportService,
     WritingPracticeQuizService,
+    ProgressService,
 )
 from .models import Word, WritingPractice
 
 
+WORDS_PER_PAGE = 30
+MIN_SEARCH_LENGTH = 2
+# Search runs once the query has been left alone this long.
+SEARCH_DEBOUNCE_SECONDS = 0.4
+# Cached pages expire so writes from other sessions or the CLI show up, and
+# only the most recently used ones are kept.
+PAGE_CACHE_TTL_SECONDS = 30
+PAGE_CACHE_SIZE = 50
+
+
 class WordListController:
     def __init__(self):
         self.word_service = WordService()
+        # (search, cursor) -> (loaded at, words, next cursor), oldest use first.
+        self._page_cache = OrderedDict()
+
+    def get_words_page(
+        self,
+        search_query: Optional[str] = None,
+        cursor: Optional[tuple[str, str]] = None,
+    ) -> tuple[List[Word], Optional[tuple[str, str]]]:
+        """
+        Returns one page of words, optionally those containing the search
+        query (case-insensitive). Queries shorter than MIN_SEARCH_LENGTH list
+        all words, and recently seen pages are served from the cache.
+        """
+        search = (search_query or "").strip()
+        if len(search) < MIN_SEARCH_LENGTH:
+            search = ""
+        key = (search, cursor)
+        now = time.monotonic()
+        cached = self._page_cache.get(key)
+        if cached is not None and now - cached[0] < PAGE_CACHE_TTL_SECONDS:
+            self._page_cache.move_to_end(key)
+            return cached[1], cached[2]
+
+        words, next_cursor = self.word_service.get_words_page(
+            WORDS_PER_PAGE, cursor=cursor, search=search or None
+        )
+        self._page_cache[key] = (now, words, next_cursor)
+        self._page_cache.move_to_end(key)
+        while len(self._page_cache) > PAGE_CACHE_SIZE:
+            self._page_cache.popitem(last=False)
+        return words, next_cursor
+
+    def clear_cache(self):
+        """Drops cached pages, e.g. after words were added."""
+        self._page_cache.clear()
 
     def get_words(self, search_query: Optional[str] = None) -> List[Word]:
         if search_query:
@@ -32,13 +84,33 @@ class WordDetailController:
         )
 
 
+class ProgressController:
+    def __init__(self):
+        self.progress_service = ProgressService()
+
+    def get_dashboard(self, days: int = 30) -> dict:
+        """Get progress statistics for the last N days."""
+        return self.progress_service.get_dashboard(days)
+
+
 class WordImportController:
     def __init__(self):
         self.import_service = WordImportService()
 
-    def import_word_from_json(self, json_data: str) -> Word:
-        """Import word from JSON data."""
-        return self.import_service.import_word_from_json(json_data)
+    def import_word_from_json(self, json_data: str, merge: bool = False) -> Word:
+        """Import word from JSON data, optionally merging into an existing word."""
+        return self.import_service.import_word_from_json(json_data, merge)
+
+    def import_deck(self, uploaded_file, merge: bool = False) -> tuple[int, int]:
+        """Stream an uploaded .tsv/.csv deck into the database."""
+        lines = upload_lines(uploaded_file)
+        return transfer.import_deck(
+            lines, transfer.format_from_name(uploaded_file.name), merge
+        )
+
+    def export_deck(self, file_format: str):
+        """Write all words to a temporary deck file and return it, rewound."""
+        return spool_lines(transfer.export_deck(file_format))
 
 
 class WritingPracticeQuizController:
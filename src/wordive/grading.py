@@ -0,0 +1,88 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+
+TOKEN_PATTERN = re.compile(r"[\w']+")
+MAX_NGRAM = 4
+
+
+def normalize_tokens(text: str) -> tuple[str, ...]:
+    """Case-folded word tokens without punctuation."""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    text = text.replace("’", "'")
+    return tuple(TOKEN_PATTERN.findall(text))
+
+
+def _ngrams(tokens: tuple[str, ...]) -> tuple[Counter, ...]:
+    return tuple(
+        Counter(tokens[i : i + n] for i in range(len(tokens) - n + 1))
+        for n in range(1, MAX_NGRAM + 1)
+    )
+
+
+@lru_cache(maxsize=4096)
+def _reference(answer: str):
+    """Tokens and n-gram counts of a model answer, computed once per text."""
+    tokens = normalize_tokens(answer)
+    return tokens, _ngrams(tokens)
+
+
+def token_edit_distance(a: tuple[str, ...], b: tuple[str, ...]) -> int:
+    """Levenshtein distance counted in whole tokens."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, token_a in enumerate(a, 1):
+        current = [i]
+        for j, token_b in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (token_a != token_b),
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+def bleu(candidate: tuple[str, ...], reference_ngrams, reference_length: int) -> float:
+    """
+    Sentence-level BLEU against a single reference, with add-one smoothing
+    for higher-order n-grams so short sentences don't collapse to zero.
+    """
+    if not candidate or not reference_length:
+        return 0.0
+    log_precision = 0.0
+    for n, (counts, reference_counts) in enumerate(
+        zip(_ngrams(candidate), reference_ngrams), 1
+    ):
+        total = max(len(candidate) - n + 1, 0)
+        matched = sum(min(c, reference_counts[g]) for g, c in counts.items())
+        if n == 1:
+            if not matched:
+                return 0.0
+            log_precision += math.log(matched / total)
+        else:
+            log_precision += math.log((matched + 1) / (total + 1))
+    brevity = min(1.0, math.exp(1 - reference_length / len(candidate)))
+    return brevity * math.exp(log_precision / MAX_NGRAM)
+
+
+def grade(user_answer: str, english_answer: str) -> float:
+    """
+    Scores an attempt against the model answer from 0.0 to 1.0: the mean of
+    token edit similarity and BLEU.
+    """
+    reference, reference_ngrams = _reference(english_answer)
+    candidate = normalize_tokens(user_answer)
+    if not reference or not candidate:
+        return 0.0
+    if candidate == reference:
+        return 1.0
+    distance = token_edit_distance(candidate, reference)
+    edit_similarity = 1.0 - distance / max(len(candidate), len(reference))
+    score = (edit_similarity + bleu(candidate, reference_ngrams, len(reference))) / 2
+    return round(score, 4)
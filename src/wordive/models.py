@@ -1,7 +1,8 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
 
-from sqlmodel import Field, Relationship, SQLModel, Column, Text
+from sqlalchemy import func
+from sqlmodel import Field, Index, Relationship, SQLModel, Column, Text
 
 
 class Word(SQLModel, table=True):
@@ -15,6 +16,15 @@ class Word(SQLModel, table=True):
     )
 
 
+# Serves the case-insensitive word list: lower(word) is the keyset order and
+# word breaks ties between words that differ only in case.
+Index(
+    "ix_wordive_words_lower_word",
+    func.lower(Word.__table__.c.word),
+    Word.__table__.c.word,
+)
+
+
 class WordUsage(SQLModel, table=True):
     __tablename__ = "wordive_word_usages"
 
@@ -73,7 +83,39 @@ class UserAttempt(SQLModel, table=True):
     )
     user_answer: str = Field(sa_column=Column(Text))
     created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    # 0.0-1.0 similarity to the practice's english_answer; None if ungraded.
+    score: Optional[float] = None
 
     writing_practice: Optional[WritingPractice] = Relationship(
         back_populates="attempts"
     )
+
+
+class PracticeDailyStat(SQLModel, table=True):
+    """Attempts per practice per (UTC) day, maintained on every attempt."""
+
+    __tablename__ = "wordive_practice_daily_stats"
+
+    day: date = Field(primary_key=True)
+    writing_practice_id: int = Field(
+        primary_key=True, foreign_key="wordive_writing_practices.id"
+    )
+    word_id: Optional[int] = Field(
+        default=None, foreign_key="wordive_words.id", index=True
+    )
+    attempt_count: int = 0
+    graded_count: int = 0
+    score_sum: float = 0.0
+    last_attempt_at: Optional[datetime] = None
+
+
+class DailyStat(SQLModel, table=True):
+    """Attempts across all practices per (UTC) day."""
+
+    __tablename__ = "wordive_daily_stats"
+
+    day: date = Field(primary_key=True)
+    attempt_count: int = 0
+    graded_count: int = 0
+    score_sum: float = 0.0
+    last_attempt_at: Optional[datetime] = None
@@ -1,10 +1,322 @@
+from collections import deque
+
+from sqlalchemy import bindparam, case, delete, func, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session, select
+
 from common.repository.base import BaseRepository
-from .models import Word, WordUsage, ExampleSentence, WritingPractice, UserAttempt
+from database import engine, sync_table
+from .models import (
+    Word,
+    WordUsage,
+    ExampleSentence,
+    WritingPractice,
+    UserAttempt,
+    PracticeDailyStat,
+    DailyStat,
+)
+
+
+def _load_rows(connection, word_ids):
+    """
+    Reads the usages, examples and practices of the given words as plain
+    rows in id order, grouped by their parent: {word id: [(usage id,
+    usage_type, description)]}, {usage id: [(example id, english, korean)]}
+    and {usage id: [(practice id, korean, english)]}. Unlike keying by
+    natural key, rows that repeat a usage_type or sentence are all kept.
+    """
+    usages, examples, practices = {}, {}, {}
+    for usage_id, word_id, usage_type, description in connection.execute(
+        select(
+            WordUsage.id,
+            WordUsage.word_id,
+            WordUsage.usage_type,
+            WordUsage.description,
+        )
+        .where(WordUsage.word_id.in_(word_ids))
+        .order_by(WordUsage.id)
+    ):
+        usages.setdefault(word_id, []).append((usage_id, usage_type, description))
+    for example_id, usage_id, english, korean in connection.execute(
+        select(
+            ExampleSentence.id,
+            ExampleSentence.word_usage_id,
+            ExampleSentence.english_sentence,
+            ExampleSentence.korean_sentence,
+        )
+        .join(WordUsage, WordUsage.id == ExampleSentence.word_usage_id)
+        .where(WordUsage.word_id.in_(word_ids))
+        .order_by(ExampleSentence.id)
+    ):
+        examples.setdefault(usage_id, []).append((example_id, english, korean))
+    for practice_id, usage_id, korean, english in connection.execute(
+        select(
+            WritingPractice.id,
+            WritingPractice.word_usage_id,
+            WritingPractice.korean_sentence,
+            WritingPractice.english_answer,
+        )
+        .join(WordUsage, WordUsage.id == WritingPractice.word_usage_id)
+        .where(WordUsage.word_id.in_(word_ids))
+        .order_by(WritingPractice.id)
+    ):
+        practices.setdefault(usage_id, []).append((practice_id, korean, english))
+    return usages, examples, practices
+
+
+def _match(rows, items, field):
+    """
+    Pairs each item with the first unused row whose key (row[1]) equals
+    item[field], or with None when there is none left. Repeated keys thus
+    pair up in order instead of all landing on one row.
+    """
+    unused = {}
+    for row in rows:
+        unused.setdefault(row[1], deque()).append(row)
+    pairs = []
+    for item in items:
+        candidates = unused.get(item[field])
+        pairs.append((item, candidates.popleft() if candidates else None))
+    return pairs
+
+
+def _update_rows(connection, column, rows):
+    """Sets column to "value" for each {"row_id", "value"} in rows."""
+    if rows:
+        model = column.class_
+        connection.execute(
+            update(model)
+            .where(model.id == bindparam("row_id"))
+            .values({column.key: bindparam("value")}),
+            rows,
+        )
 
 
 class WordRepository(BaseRepository):
     def __init__(self):
         super().__init__(Word)
+        # Whole word graphs are written through this repository; merges read
+        # attempts to keep the practices that have them.
+        for model in (WordUsage, ExampleSentence, WritingPractice, UserAttempt):
+            sync_table(model.__table__)
+
+    def iter_records(self, batch_size=500):
+        """
+        Yields every word as a record dict in alphabetical order, reading
+        batch_size words (and their details) per round trip. Rows are read
+        as plain tuples rather than ORM objects to keep large exports fast.
+        """
+        cursor = None
+        while True:
+            with engine.connect() as connection:
+                statement = select(self.model.id, self.model.word).order_by(
+                    self.model.word
+                )
+                if cursor is not None:
+                    statement = statement.where(self.model.word > cursor)
+                words = connection.execute(statement.limit(batch_size)).all()
+                if not words:
+                    return
+                usages, examples, practices = _load_rows(
+                    connection, [word_id for word_id, _ in words]
+                )
+
+            for word_id, word in words:
+                yield {
+                    "word": word,
+                    "usages": [
+                        {
+                            "usage_type": usage_type,
+                            "description": description,
+                            "examples": [
+                                {"english_sentence": english, "korean_sentence": korean}
+                                for _, english, korean in examples.get(usage_id, [])
+                            ],
+                            "writing_practices": [
+                                {"korean_sentence": korean, "english_answer": english}
+                                for _, korean, english in practices.get(usage_id, [])
+                            ],
+                        }
+                        for usage_id, usage_type, description in usages.get(word_id, [])
+                    ],
+                }
+            cursor = words[-1][1]
+
+    def upsert_records(self, records, merge=False):
+        """
+        Applies a batch of word records in one transaction. Records of the
+        same word are applied together, as one record. Usages are matched
+        by usage_type, examples by their English sentence and practices by
+        their Korean sentence; repeated keys are matched in order, so a
+        word with two "verb" usages keeps both.
+
+        By default existing words are only extended: missing rows are
+        inserted and empty descriptions filled. With merge=True each record
+        is authoritative for its word: changed descriptions and translations
+        are updated and rows missing from the record are deleted, except
+        practices with attempts, which are kept so no history is lost.
+        Words not in the batch are never touched. Returns the number of
+        words created and the number of existing words that changed.
+
+        Everything goes through executemany statements: building ORM objects
+        for every row dominated the time of large imports.
+        """
+        word_usages = {}
+        for record in records:
+            word_usages.setdefault(record["word"], []).extend(record.get("usages", []))
+        with engine.begin() as connection:
+            word_ids = self._get_word_ids(connection, list(word_usages))
+            new_words = [word for word in word_usages if word not in word_ids]
+            if new_words:
+                connection.execute(
+                    insert(self.model), [{"word": word} for word in new_words]
+                )
+                word_ids = self._get_word_ids(connection, list(word_usages))
+            changed = set()
+
+            usages, _, _ = _load_rows(connection, list(word_ids.values()))
+            new_usages, descriptions = [], []
+            for word, items in word_usages.items():
+                word_id = word_ids[word]
+                for usage, row in _match(usages.get(word_id, []), items, "usage_type"):
+                    description = usage.get("description") or None
+                    if row is None:
+                        new_usages.append(
+                            {
+                                "word_id": word_id,
+                                "usage_type": usage["usage_type"],
+                                "description": description,
+                            }
+                        )
+                        changed.add(word)
+                    elif description != row[2] and (merge or not row[2]):
+                        descriptions.append({"row_id": row[0], "value": description})
+                        changed.add(word)
+            if new_usages:
+                connection.execute(insert(WordUsage), new_usages)
+            _update_rows(connection, WordUsage.description, descriptions)
+
+            # New usages have the highest ids, so matching again pairs every
+            # usage with the row it matched above or the one inserted for it.
+            usages, examples, practices = _load_rows(
+                connection, list(word_ids.values())
+            )
+            new_examples, new_practices = [], []
+            translations, answers = [], []
+            kept = set()
+            for word, items in word_usages.items():
+                word_id = word_ids[word]
+                matched = _match(usages.get(word_id, []), items, "usage_type")
+                for usage, (usage_id, _, _) in matched:
+                    kept.add((WordUsage, usage_id))
+                    for example, row in _match(
+                        examples.get(usage_id, []),
+                        usage.get("examples", []),
+                        "english_sentence",
+                    ):
+                        if row is None:
+                            new_examples.append({"word_usage_id": usage_id, **example})
+                            changed.add(word)
+                            continue
+                        kept.add((ExampleSentence, row[0]))
+                        if merge and row[2] != example["korean_sentence"]:
+                            translations.append(
+                                {"row_id": row[0], "value": example["korean_sentence"]}
+                            )
+                            changed.add(word)
+                    for practice, row in _match(
+                        practices.get(usage_id, []),
+                        usage.get("writing_practices", []),
+                        "korean_sentence",
+                    ):
+                        if row is None:
+                            new_practices.append(
+                                {"word_usage_id": usage_id, **practice}
+                            )
+                            changed.add(word)
+                            continue
+                        kept.add((WritingPractice, row[0]))
+                        if merge and row[2] != practice["english_answer"]:
+                            answers.append(
+                                {"row_id": row[0], "value": practice["english_answer"]}
+                            )
+                            changed.add(word)
+            if new_examples:
+                connection.execute(insert(ExampleSentence), new_examples)
+            if new_practices:
+                connection.execute(insert(WritingPractice), new_practices)
+            _update_rows(connection, ExampleSentence.korean_sentence, translations)
+            _update_rows(connection, WritingPractice.english_answer, answers)
+
+            if merge:
+                word_names = {word_id: word for word, word_id in word_ids.items()}
+                usage_words = {
+                    usage_id: word_names[word_id]
+                    for word_id, rows in usages.items()
+                    for usage_id, _, _ in rows
+                }
+                touched = self._delete_stale(
+                    connection,
+                    list(word_ids.values()),
+                    usage_ids={
+                        usage_id
+                        for usage_id in usage_words
+                        if (WordUsage, usage_id) not in kept
+                    },
+                    examples={
+                        example_id: usage_id
+                        for usage_id, rows in examples.items()
+                        for example_id, _, _ in rows
+                        if (ExampleSentence, example_id) not in kept
+                    },
+                    practices={
+                        practice_id: usage_id
+                        for usage_id, rows in practices.items()
+                        for practice_id, _, _ in rows
+                        if (WritingPractice, practice_id) not in kept
+                    },
+                )
+                changed.update(usage_words[usage_id] for usage_id in touched)
+        return len(new_words), len(changed - set(new_words))
+
+    def _delete_stale(self, connection, word_ids, usage_ids, examples, practices):
+        """
+        Deletes the given {example id: usage id} and {practice id: usage id}
+        rows and the given usages, except practices that have attempts and
+        the usages holding them. Returns the ids of the usages that lost rows
+        (or were deleted).
+        """
+        attempted = dict(
+            connection.execute(
+                select(WritingPractice.id, WritingPractice.word_usage_id)
+                .join(WordUsage, WordUsage.id == WritingPractice.word_usage_id)
+                .where(
+                    WordUsage.word_id.in_(word_ids),
+                    WritingPractice.id.in_(select(UserAttempt.writing_practice_id)),
+                )
+            ).all()
+        )
+        practices = {
+            practice_id: usage_id
+            for practice_id, usage_id in practices.items()
+            if practice_id not in attempted
+        }
+        usage_ids = set(usage_ids) - set(attempted.values())
+        for model, ids in (
+            (ExampleSentence, examples),
+            (WritingPractice, practices),
+            (WordUsage, usage_ids),
+        ):
+            if ids:
+                connection.execute(delete(model).where(model.id.in_(list(ids))))
+        return set(examples.values()) | set(practices.values()) | usage_ids
+
+    def _get_word_ids(self, connection, words):
+        return dict(
+            connection.execute(
+                select(self.model.word, self.model.id).where(self.model.word.in_(words))
+            ).all()
+        )
 
 
 class WordUsageRepository(BaseRepository):
@@ -22,6 +334,171 @@ class WritingPracticeRepository(BaseRepository):
         super().__init__(WritingPractice)
 
 
+class _DailyRollupRepository(BaseRepository):
+    """Upserts of one attempt into a rollup table keyed by day (and more)."""
+
+    key_columns: tuple = ("day",)
+
+    def record(self, session, attempt, **keys):
+        graded = attempt.score is not None
+        statement = insert(self.model).values(
+            day=attempt.created_at.date(),
+            attempt_count=1,
+            graded_count=int(graded),
+            score_sum=attempt.score or 0.0,
+            last_attempt_at=attempt.created_at,
+            **keys,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=list(self.key_columns),
+            set_={
+                "attempt_count": self.model.attempt_count + 1,
+                "graded_count": self.model.graded_count + int(graded),
+                "score_sum": self.model.score_sum + (attempt.score or 0.0),
+                "last_attempt_at": func.max(
+                    self.model.last_attempt_at, statement.excluded.last_attempt_at
+                ),
+            },
+        )
+        session.exec(statement)
+
+    def is_empty(self):
+        with Session(engine) as session:
+            return session.exec(select(self.model).limit(1)).first() is None
+
+
+class PracticeDailyStatRepository(_DailyRollupRepository):
+    key_columns = ("day", "writing_practice_id")
+
+    def __init__(self):
+        super().__init__(PracticeDailyStat)
+
+    def get_word_stats_since(self, since):
+        """
+        Returns (word, attempts, graded, score_sum, last_attempt_at) per word
+        practised on or after `since`, most attempted first.
+        """
+        with Session(engine) as session:
+            statement = (
+                select(
+                    Word.word,
+                    func.sum(self.model.attempt_count),
+                    func.sum(self.model.graded_count),
+                    func.sum(self.model.score_sum),
+                    func.max(self.model.last_attempt_at),
+                )
+                .join(Word, Word.id == self.model.word_id)
+                .where(self.model.day >= since)
+                .group_by(self.model.word_id)
+                .order_by(func.sum(self.model.attempt_count).desc())
+            )
+            return session.exec(statement).all()
+
+
+class DailyStatRepository(_DailyRollupRepository):
+    def __init__(self):
+        super().__init__(DailyStat)
+
+    def get_since(self, since):
+        with Session(engine) as session:
+            statement = (
+                select(self.model)
+                .where(self.model.day >= since)
+                .order_by(self.model.day)
+            )
+            return session.exec(statement).all()
+
+    def get_totals(self):
+        """Returns (attempts, graded, score_sum, active days) over all time."""
+        with Session(engine) as session:
+            statement = select(
+                func.coalesce(func.sum(self.model.attempt_count), 0),
+                func.coalesce(func.sum(self.model.graded_count), 0),
+                func.coalesce(func.sum(self.model.score_sum), 0.0),
+                func.count(),
+            )
+            return session.exec(statement).one()
+
+
 class UserAttemptRepository(BaseRepository):
     def __init__(self):
         super().__init__(UserAttempt)
+        self.practice_stats = PracticeDailyStatRepository()
+        self.daily_stats = DailyStatRepository()
+        self.backfill_stats()
+
+    def create_with_stats(self, word_id, **kwargs):
+        """
+        Stores the attempt and folds it into the daily rollups in one
+        transaction, so the rollups always match the attempt history.
+        """
+        attempt = self.model(**kwargs)
+        with Session(engine) as session:
+            session.add(attempt)
+            session.flush()
+            self.practice_stats.record(
+                session,
+                attempt,
+                writing_practice_id=attempt.writing_practice_id,
+                word_id=word_id,
+            )
+            self.daily_stats.record(session, attempt)
+            session.commit()
+            session.refresh(attempt)
+            return attempt
+
+    def backfill_stats(self):
+        """
+        Builds the rollups from existing attempts the first time they are
+        used, with two INSERT ... SELECT ... GROUP BY statements.
+        """
+        if not self.daily_stats.is_empty():
+            return
+        day = func.date(self.model.created_at)
+        graded = func.sum(case((self.model.score.is_not(None), 1), else_=0))
+        score_sum = func.coalesce(func.sum(self.model.score), 0.0)
+        last_attempt_at = func.max(self.model.created_at)
+        with Session(engine) as session:
+            session.exec(
+                insert(PracticeDailyStat).from_select(
+                    [
+                        "day",
+                        "writing_practice_id",
+                        "word_id",
+                        "attempt_count",
+                        "graded_count",
+                        "score_sum",
+                        "last_attempt_at",
+                    ],
+                    select(
+                        day,
+                        self.model.writing_practice_id,
+                        WordUsage.word_id,
+                        func.count(),
+                        graded,
+                        score_sum,
+                        last_attempt_at,
+                    )
+                    .join(
+                        WritingPractice,
+                        WritingPractice.id == self.model.writing_practice_id,
+                    )
+                    .join(WordUsage, WordUsage.id == WritingPractice.word_usage_id)
+                    .group_by(day, self.model.writing_practice_id),
+                )
+            )
+            session.exec(
+                insert(DailyStat).from_select(
+                    [
+                        "day",
+                        "attempt_count",
+                        "graded_count",
+                        "score_sum",
+                        "last_attempt_at",
+                    ],
+                    select(day, func.count(), graded, score_sum, last_attempt_at)
+                    .where(self.model.writing_practice_id.is_not(None))
+                    .group_by(day),
+                )
+            )
+            session.commit()
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 from typing import List, Optional
 import random
 
+from sqlalchemy import func, tuple_
 from sqlmodel import Session, select
 from database import engine
 
@@ -12,7 +13,10 @@ from .repository import (
     ExampleSentenceRepository,
     WritingPracticeRepository,
     UserAttemptRepository,
+    PracticeDailyStatRepository,
+    DailyStatRepository,
 )
+from .grading import grade
 from .models import Word, WordUsage, ExampleSentence, WritingPractice, UserAttempt
 
 
@@ -28,6 +32,44 @@ class WordService:
             statement = select(Word).where(Word.word.ilike(f"%{query}%"))
             return list(session.exec(statement).all())
 
+    def get_words_page(
+        self,
+        limit: int,
+        cursor: Optional[tuple[str, str]] = None,
+        search: Optional[str] = None,
+    ) -> tuple[List[Word], Optional[tuple[str, str]]]:
+        """
+        Returns one page of words in case-insensitive alphabetical order and
+        the cursor for the next page (None on the last page). The cursor is
+        (lower(word), word) of the last word shown, so each page continues
+        from there on the lower(word) index instead of skipping rows.
+
+        `search` matches case-insensitively anywhere in the word, as before.
+        Without it a page reads limit + 1 index entries; with it the index
+        is walked until limit + 1 matches are found.
+        """
+        key = func.lower(Word.word)
+        with Session(engine) as session:
+            statement = select(Word, key)
+            if search:
+                statement = statement.where(
+                    Word.word.icontains(search, autoescape=True)
+                )
+            if cursor is not None:
+                # The plain bound lets SQLite seek the index; the row value
+                # alone would scan it from the start.
+                statement = statement.where(
+                    key >= cursor[0], tuple_(key, Word.word) > tuple_(*cursor)
+                )
+            statement = statement.order_by(key, Word.word).limit(limit + 1)
+            rows = session.exec(statement).all()
+
+        words = [word for word, _ in rows[:limit]]
+        if len(rows) > limit:
+            last_word, last_key = rows[limit - 1]
+            return words, (last_key, last_word.word)
+        return words, None
+
     def get_word_by_id(self, word_id: int) -> Optional[Word]:
         return self.repository.get(word_id)
 
@@ -69,11 +111,94 @@ class WordDetailService:
     def save_user_attempt(
         self, writing_practice_id: int, user_answer: str
     ) -> UserAttempt:
-        return self.attempt_repository.create(
-            writing_practice_id=writing_practice_id, user_answer=user_answer
+        practice = self.practice_repository.get(writing_practice_id)
+        score = grade(user_answer, practice.english_answer) if practice else None
+        usage = self.usage_repository.get(practice.word_usage_id) if practice else None
+        return self.attempt_repository.create_with_stats(
+            word_id=usage.word_id if usage else None,
+            writing_practice_id=writing_practice_id,
+            user_answer=user_answer,
+            score=score,
         )
 
 
+class ProgressService:
+    """Learning progress read only from the daily rollup tables."""
+
+    def __init__(self):
+        # Creating the attempt repository backfills the rollups if needed.
+        self.attempt_repository = UserAttemptRepository()
+        self.practice_stats = PracticeDailyStatRepository()
+        self.daily_stats = DailyStatRepository()
+
+    def get_dashboard(self, days: int = 30) -> dict:
+        today = datetime.utcnow().date()
+        since = today - timedelta(days=days - 1)
+        by_day = {stat.day: stat for stat in self.daily_stats.get_since(since)}
+        daily = []
+        for offset in range(days):
+            day = since + timedelta(days=offset)
+            stat = by_day.get(day)
+            daily.append(
+                {
+                    "day": day,
+                    "attempts": stat.attempt_count if stat else 0,
+                    "accuracy": stat.score_sum / stat.graded_count
+                    if stat and stat.graded_count
+                    else None,
+                }
+            )
+
+        attempts, graded, score_sum, active_days = self.daily_stats.get_totals()
+        words = [
+            {
+                "word": word,
+                "attempts": word_attempts,
+                "accuracy": word_score_sum / word_graded if word_graded else None,
+                "last_attempt_at": last_attempt_at,
+            }
+            for word, word_attempts, word_graded, word_score_sum, last_attempt_at in (
+                self.practice_stats.get_word_stats_since(since)
+            )
+        ]
+        return {
+            "total_attempts": attempts,
+            "accuracy": score_sum / graded if graded else None,
+            "active_days": active_days,
+            "today_attempts": daily[-1]["attempts"],
+            "daily": daily,
+            "words": words,
+        }
+
+
+def _to_record(data: dict) -> dict:
+    """Fills in the defaults the JSON format allows to leave out."""
+    return {
+        "word": data["word"],
+        "usages": [
+            {
+                "usage_type": usage_data.get("usage_type", ""),
+                "description": usage_data.get("description"),
+                "examples": [
+                    {
+                        "english_sentence": example_data.get("english_sentence", ""),
+                        "korean_sentence": example_data.get("korean_sentence", ""),
+                    }
+                    for example_data in usage_data.get("examples", [])
+                ],
+                "writing_practices": [
+                    {
+                        "korean_sentence": practice_data.get("korean_sentence", ""),
+                        "english_answer": practice_data.get("english_answer", ""),
+                    }
+                    for practice_data in usage_data.get("writing_practices", [])
+                ],
+            }
+            for usage_data in data.get("usages", [])
+        ],
+    }
+
+
 class WordImportService:
     def __init__(self):
         self.word_repository = WordRepository()
@@ -81,8 +206,11 @@ class WordImportService:
         self.example_repository = ExampleSentenceRepository()
         self.practice_repository = WritingPracticeRepository()
 
-    def import_word_from_json(self, json_data: str) -> Word:
-        """Parse JSON and create word with all related data."""
+    def import_word_from_json(self, json_data: str, merge: bool = False) -> Word:
+        """
+        Parse JSON and create word with all related data. With merge, an
+        existing word is updated to match the JSON instead of rejected.
+        """
         try:
             data = json.loads(json_data)
         except json.JSONDecodeError as e:
@@ -92,13 +220,19 @@ class WordImportService:
         if not word_text:
             raise ValueError("JSON must contain a 'word' field")
 
+        if merge:
+            # One transaction that creates the word or updates it in place.
+            self.word_repository.upsert_records([_to_record(data)], merge=True)
+            with Session(engine) as session:
+                return session.exec(select(Word).where(Word.word == word_text)).one()
+
         # Check if word already exists
         with Session(engine) as session:
             existing_word = session.exec(
                 select(Word).where(Word.word == word_text)
             ).first()
-            if existing_word:
-                raise ValueError(f"Word '{word_text}' already exists")
+        if existing_word:
+            raise ValueError(f"Word '{word_text}' already exists")
 
         # Create word
         word = self.word_repository.create(word=word_text)
@@ -0,0 +1,219 @@
+"""
+Import/export of Wordive words as Anki-style TSV or CSV decks.
+
+One row per card: word, usage_type, description, card_type, english, korean.
+card_type is "example" (an example sentence), "practice" (a writing
+practice: korean is the prompt, english the answer) or empty for a usage
+without cards. Rows of the same word should be consecutive, as in exports;
+merge imports also accept a word's rows spread over the deck (see
+read_records). Consecutive rows with the same usage_type form one usage. A new usage starts when the
+description changes, or when an example row follows a practice row or a
+cardless row (the order exports write them in). That way repeated usage
+types survive a round trip.
+
+    PYTHONPATH=src python -m wordive.transfer export deck.tsv
+    PYTHONPATH=src python -m wordive.transfer import deck.tsv
+    PYTHONPATH=src python -m wordive.transfer import deck.tsv --merge
+
+By default imports only add what is missing; --merge makes the deck
+authoritative for the words it contains (see WordRepository.upsert_records).
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+from itertools import groupby, islice
+
+from common.transfer.lines import csv_lines
+from wordive.repository import WordRepository
+
+DECK_FIELDS = ["word", "usage_type", "description", "card_type", "english", "korean"]
+IMPORT_BATCH_WORDS = 500
+
+
+def _dialect(file_format):
+    return {"delimiter": "\t"} if file_format == "tsv" else {}
+
+
+def _record_rows(record):
+    for usage in record["usages"]:
+        base = [record["word"], usage["usage_type"], usage["description"] or ""]
+        cards = [
+            ["example", example["english_sentence"], example["korean_sentence"]]
+            for example in usage["examples"]
+        ] + [
+            ["practice", practice["english_answer"], practice["korean_sentence"]]
+            for practice in usage["writing_practices"]
+        ]
+        for card in cards or [["", "", ""]]:
+            yield base + card
+
+
+def _deck_rows():
+    yield DECK_FIELDS
+    for record in WordRepository().iter_records():
+        yield from _record_rows(record)
+
+
+def export_deck(file_format="tsv"):
+    """Yields deck lines (with a header row), one word at a time."""
+    yield from csv_lines(_deck_rows(), **_dialect(file_format))
+
+
+def read_rows(lines, file_format="tsv"):
+    """
+    Yields deck rows as dicts. Anki header lines ("#separator:tab" etc.) are
+    skipped, and a header row is optional.
+    """
+    lines = (line for line in lines if not line.startswith("#"))
+    for row_no, row in enumerate(csv.reader(lines, **_dialect(file_format)), 1):
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        if row_no == 1 and row[0].strip().lower() == "word":
+            continue
+        row = dict(zip(DECK_FIELDS, (cell.strip() for cell in row)))
+        if not row.get("word"):
+            raise ValueError(f"Row {row_no}: missing word")
+        yield row
+
+
+def _starts_usage(usage, previous_card, row):
+    """Whether row begins a new usage rather than continuing usage."""
+    if usage is None or usage["usage_type"] != row.get("usage_type", ""):
+        return True
+    description = row.get("description")
+    if description and usage["description"] and description != usage["description"]:
+        return True
+    card_type = row.get("card_type", "").lower()
+    return previous_card == "" or (
+        previous_card == "practice" and card_type != "practice"
+    )
+
+
+def _to_record(word, rows):
+    usages = []
+    previous_card = None
+    for row in rows:
+        if _starts_usage(usages[-1] if usages else None, previous_card, row):
+            usages.append(
+                {
+                    "usage_type": row.get("usage_type", ""),
+                    "description": None,
+                    "examples": [],
+                    "writing_practices": [],
+                }
+            )
+        usage = usages[-1]
+        usage["description"] = usage["description"] or row.get("description") or None
+        previous_card = row.get("card_type", "").lower()
+        if previous_card == "example":
+            usage["examples"].append(
+                {
+                    "english_sentence": row.get("english", ""),
+                    "korean_sentence": row.get("korean", ""),
+                }
+            )
+        elif previous_card == "practice":
+            usage["writing_practices"].append(
+                {
+                    "korean_sentence": row.get("korean", ""),
+                    "english_answer": row.get("english", ""),
+                }
+            )
+    return {"word": word, "usages": usages}
+
+
+def _regroup(rows):
+    """
+    Yields rows so that each word's rows are consecutive, words in order of
+    first appearance and rows in deck order. The rows are sorted in a
+    temporary SQLite file rather than in memory.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        connection = sqlite3.connect(os.path.join(directory, "rows.db"))
+        try:
+            connection.execute(
+                "CREATE TABLE rows (seq INTEGER PRIMARY KEY, word TEXT, row TEXT)"
+            )
+            connection.executemany(
+                "INSERT INTO rows (word, row) VALUES (?, ?)",
+                ((row["word"], json.dumps(row)) for row in rows),
+            )
+            connection.execute("CREATE INDEX rows_word ON rows (word, seq)")
+            for (row,) in connection.execute(
+                "SELECT row FROM rows"
+                " JOIN (SELECT word, min(seq) AS first FROM rows GROUP BY word)"
+                " USING (word) ORDER BY first, seq"
+            ):
+                yield json.loads(row)
+        finally:
+            connection.close()
+
+
+def read_records(lines, file_format="tsv", regroup=False):
+    """
+    Groups consecutive rows of the same word into word records, holding one
+    word's rows at a time. With regroup, rows of a word spread over the deck
+    are brought together first, on disk. Merges need that: a later part of
+    a word would otherwise delete what an earlier part wrote.
+    """
+    rows = read_rows(lines, file_format)
+    if regroup:
+        rows = _regroup(rows)
+    for word, word_rows in groupby(rows, key=lambda row: row["word"]):
+        yield _to_record(word, word_rows)
+
+
+def import_records(records, batch_size=IMPORT_BATCH_WORDS, merge=False):
+    """
+    Upserts (or merges) records batch_size words per transaction, so memory
+    stays bounded by the batch. Returns (words created, existing words
+    updated).
+    """
+    repository = WordRepository()
+    created = updated = 0
+    records = iter(records)
+    while batch := list(islice(records, batch_size)):
+        batch_created, batch_updated = repository.upsert_records(batch, merge)
+        created += batch_created
+        updated += batch_updated
+    return created, updated
+
+
+def import_deck(lines, file_format="tsv", merge=False):
+    """Imports an iterable of deck lines in "tsv" or "csv" format."""
+    return import_records(read_records(lines, file_format, regroup=merge), merge=merge)
+
+
+def format_from_name(name):
+    return "csv" if name.lower().endswith(".csv") else "tsv"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("path")
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="update and delete rows of existing words to match the deck",
+    )
+    args = parser.parse_args(argv)
+
+    file_format = format_from_name(args.path)
+    if args.action == "export":
+        with open(args.path, "w", encoding="utf-8", newline="") as f:
+            f.writelines(export_deck(file_format))
+        print(f"Exported words to {args.path}")
+    else:
+        with open(args.path, "r", encoding="utf-8", newline="") as f:
+            created, updated = import_deck(f, file_format, args.merge)
+        print(f"Imported {args.path}: {created} new words, {updated} updated")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
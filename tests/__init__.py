@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+# database.py opens playground.db in the working directory on import, so the
+# tests run somewhere disposable.
+os.chdir(tempfile.mkdtemp(prefix="playground-tests-"))
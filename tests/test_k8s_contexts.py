@@ -0,0 +1,151 @@
+import os
+import stat
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from k8s_command_runner import service
+
+STUB_KUBECTL = """#!/bin/sh
+# Stub kubectl: answers the subcommands context discovery and probing use.
+echo "$*" >> "$KUBECTL_CALLS"
+case "$*" in
+  "config get-contexts -o name")
+    sed -n 's/^- name: //p' "$KUBECONFIG" ;;
+  "get --raw /readyz --context "*down*)
+    echo "connection refused" >&2
+    exit 1 ;;
+  "get --raw /readyz --context "*)
+    echo ok ;;
+  "logs -f big "*)
+    head -c 2000000 /dev/zero | tr '\\0' x
+    echo ;;
+  "logs -f "*)
+    echo "hello from $3" ;;
+  *)
+    exit 2 ;;
+esac
+"""
+
+
+class KubectlStubTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        kubectl = os.path.join(self.directory, "kubectl")
+        with open(kubectl, "w") as f:
+            f.write(STUB_KUBECTL)
+        os.chmod(kubectl, os.stat(kubectl).st_mode | stat.S_IEXEC)
+        self.kubeconfig = os.path.join(self.directory, "config")
+        self.calls = os.path.join(self.directory, "calls")
+        self.write_kubeconfig(["k8s-staging-eu-shared-1"])
+
+        environ = mock.patch.dict(
+            os.environ,
+            {
+                "PATH": self.directory + os.pathsep + os.environ["PATH"],
+                "KUBECONFIG": self.kubeconfig,
+                "KUBECTL_CALLS": self.calls,
+            },
+        )
+        environ.start()
+        self.addCleanup(environ.stop)
+        service._context_cache.update(key=None, contexts=None)
+        service._health_cache.clear()
+
+    def write_kubeconfig(self, contexts):
+        with open(self.kubeconfig, "w") as f:
+            f.write("contexts:\n")
+            f.writelines(f"- name: {context}\n" for context in contexts)
+
+    def kubectl_calls(self):
+        if not os.path.exists(self.calls):
+            return []
+        with open(self.calls) as f:
+            return f.read().splitlines()
+
+
+class DiscoverContextsTest(KubectlStubTestCase):
+    def test_lists_contexts_from_kubeconfig(self):
+        self.write_kubeconfig(["k8s-production-eu-cluster-0", "eu01-infra02"])
+        self.assertEqual(
+            service.discover_contexts(),
+            ["k8s-production-eu-cluster-0", "eu01-infra02"],
+        )
+
+    def test_caches_until_kubeconfig_changes(self):
+        service.discover_contexts()
+        service.discover_contexts()
+        self.assertEqual(len(self.kubectl_calls()), 1)
+
+        self.write_kubeconfig(["k8s-staging-eu-shared-1", "k8s-dev-us-cluster-0"])
+        mtime = time.time() + 10
+        os.utime(self.kubeconfig, (mtime, mtime))
+        self.assertEqual(
+            service.discover_contexts(),
+            ["k8s-staging-eu-shared-1", "k8s-dev-us-cluster-0"],
+        )
+        self.assertEqual(len(self.kubectl_calls()), 2)
+
+    def test_returns_none_without_kubectl(self):
+        with mock.patch.dict(os.environ, {"PATH": tempfile.mkdtemp()}):
+            self.assertIsNone(service.discover_contexts())
+
+
+class BuildContextMapTest(unittest.TestCase):
+    def test_groups_known_parsed_and_other_contexts(self):
+        context_map = service.build_context_map(
+            [
+                "eu01-infra02",
+                "k8s-production-us-cluster-1",
+                "k8s-production-us-cluster-0",
+                "minikube",
+            ],
+            {"production": {"eu": ["eu01-infra02"]}},
+        )
+        self.assertEqual(
+            context_map,
+            {
+                "production": {
+                    "eu": ["eu01-infra02"],
+                    "us": [
+                        "k8s-production-us-cluster-0",
+                        "k8s-production-us-cluster-1",
+                    ],
+                },
+                "other": {"default": ["minikube"]},
+            },
+        )
+
+
+class ProbeContextsTest(KubectlStubTestCase):
+    def test_reports_reachable_and_unreachable_contexts(self):
+        health = service.probe_contexts(["cluster-up", "cluster-down"])
+
+        self.assertTrue(health["cluster-up"].reachable)
+        self.assertGreater(health["cluster-up"].latency_ms, 0)
+        self.assertFalse(health["cluster-down"].reachable)
+        self.assertEqual(health["cluster-down"].error, "connection refused")
+        self.assertIs(service.get_cached_health("cluster-up"), health["cluster-up"])
+
+    def test_serves_recent_results_from_cache(self):
+        service.probe_contexts(["cluster-up"])
+        service.probe_contexts(["cluster-up"])
+        self.assertEqual(len(self.kubectl_calls()), 1)
+
+        service.probe_contexts(["cluster-up"], max_age=-1)
+        self.assertEqual(len(self.kubectl_calls()), 2)
+
+
+class StreamPodLogsTest(KubectlStubTestCase):
+    def test_pod_that_fails_mid_stream_ends_with_an_error_line(self):
+        # "big" prints one 2 MB line, over the 1 MiB read limit.
+        lines = list(service.stream_pod_logs(["web", "big"], "ctx", "default"))
+
+        self.assertIn("[web] hello from web\n", lines)
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[-1].startswith("[big] Error: stopped reading logs"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+from why_board.repository import TaskChangeLog
+
+
+class TaskChangeLogTest(unittest.TestCase):
+    def test_reports_ids_changed_since_a_version(self):
+        log = TaskChangeLog()
+        log.record(1)
+        log.record_many([2, 3])
+        log.record(1)
+
+        self.assertEqual(log.changes_since(1), (3, {1, 2, 3}))
+        self.assertEqual(log.changes_since(3), (3, set()))
+
+    def test_write_larger_than_the_log_forces_a_full_reload(self):
+        log = TaskChangeLog(max_entries=10)
+        log.record(1)
+        log.record_many(range(100, 115))
+
+        self.assertEqual(log.changes_since(1), (2, None))
+        self.assertEqual(log.changes_since(0), (2, None))
+
+    def test_evicts_whole_writes(self):
+        log = TaskChangeLog(max_entries=4)
+        log.record_many([1, 2, 3])
+        log.record_many([4, 5])
+
+        self.assertEqual(log.changes_since(0), (2, None))
+        self.assertEqual(log.changes_since(1), (2, {4, 5}))
+
+
+if __name__ == "__main__":
+    unittest.main()
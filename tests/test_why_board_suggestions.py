@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import streamlit as st
+
+from why_board import service
+from why_board.repository import ai_response_repo, task_repo
+
+ANSWERS = {
+    "model-a": "1. What is the goal?\n2. Who is the user?",
+    "model-b": "1. What is the goal?\n2. How will it be tested?",
+}
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Answers chat completions per model; unknown models get a 400 error."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        model = request["model"]
+        if model in ANSWERS:
+            status = 200
+            body = {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": ANSWERS[model]},
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 10,
+                    "completion_tokens": 5,
+                    "total_tokens": 15,
+                },
+            }
+        else:
+            status = 400
+            body = {"error": {"message": f"unknown model {model}", "type": "invalid"}}
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class SuggestionsFromModelsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAIHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        base_url = f"http://127.0.0.1:{self.server.server_port}/v1"
+        environ = mock.patch.dict(os.environ, {"OPENAI_BASE_URL": base_url})
+        environ.start()
+        self.addCleanup(environ.stop)
+        st.session_state.openai_api_key = "test-key"
+        self.task = task_repo.add(
+            title="Ship it", description="", why="", how="", caution=""
+        )
+
+    def stream(self, variants):
+        with (
+            mock.patch.object(service.st, "warning") as warning,
+            mock.patch.object(service.st, "error") as error,
+        ):
+            results = list(
+                service.ai_response_service.stream_suggestions_from_models(
+                    self.task, variants
+                )
+            )
+        return results, warning, error
+
+    def test_streams_deduplicated_suggestions_and_saves_them(self):
+        results, warning, error = self.stream([("model-a", 0.7), ("model-b", 1.0)])
+
+        self.assertEqual(
+            {label for label, _ in results}, {"model-a (t=0.7)", "model-b (t=1.0)"}
+        )
+        questions = [q for _, text in results for q in text.splitlines()]
+        self.assertEqual(len(questions), 3)
+        self.assertEqual(len(ai_response_repo.get_for_task(self.task.id)), 2)
+        warning.assert_not_called()
+        error.assert_not_called()
+
+    def test_warns_about_failed_models(self):
+        results, warning, error = self.stream([("model-a", 0.7), ("broken", 0.7)])
+
+        self.assertEqual([label for label, _ in results], ["model-a (t=0.7)"])
+        warning.assert_called_once()
+        self.assertIn("broken (t=0.7) failed", warning.call_args.args[0])
+        error.assert_not_called()
+
+    def test_reports_an_error_when_every_model_fails(self):
+        results, warning, error = self.stream([("broken", 0.7), ("gone", 1.0)])
+
+        self.assertEqual(results, [])
+        self.assertEqual(warning.call_count, 2)
+        error.assert_called_once()
+        self.assertEqual(ai_response_repo.get_for_task(self.task.id), [])
+
+
+class LoadSuggestionVariantsTest(unittest.TestCase):
+    def test_skips_malformed_entries(self):
+        spec = "gpt-4o:0.5, bad:hot ,hot:5,gpt-4o-mini,"
+        with (
+            mock.patch.dict(os.environ, {"WHY_BOARD_AI_MODELS": spec}),
+            mock.patch.object(service.st, "warning") as warning,
+        ):
+            variants = service.load_suggestion_variants()
+
+        self.assertEqual(variants, [("gpt-4o", 0.5), ("gpt-4o-mini", 0.7)])
+        self.assertEqual(warning.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
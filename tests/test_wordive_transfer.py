@@ -0,0 +1,148 @@
+import unittest
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from database import engine
+from wordive import transfer
+from wordive.models import ExampleSentence, Word, WordUsage, WritingPractice
+from wordive.repository import WordRepository
+
+RUN = {
+    "word": "run",
+    "usages": [
+        {
+            "usage_type": "verb",
+            "description": "move fast on foot",
+            "examples": [
+                {"english_sentence": "I run.", "korean_sentence": "나는 달린다."},
+                {"english_sentence": "I run.", "korean_sentence": "나는 뛴다."},
+            ],
+            "writing_practices": [
+                {"korean_sentence": "그는 달린다.", "english_answer": "He runs."}
+            ],
+        },
+        {
+            "usage_type": "verb",
+            "description": "operate a business",
+            "examples": [
+                {"english_sentence": "She runs a shop.", "korean_sentence": "가게"}
+            ],
+            "writing_practices": [
+                {
+                    "korean_sentence": "그는 식당을 운영한다.",
+                    "english_answer": "He runs a restaurant.",
+                }
+            ],
+        },
+        {
+            "usage_type": "noun",
+            "description": None,
+            "examples": [],
+            "writing_practices": [],
+        },
+        {
+            "usage_type": "noun",
+            "description": None,
+            "examples": [
+                {"english_sentence": "A long run.", "korean_sentence": "긴 달리기."}
+            ],
+            "writing_practices": [],
+        },
+    ],
+}
+
+WALK = {
+    "word": "walk",
+    "usages": [
+        {
+            "usage_type": "verb",
+            "description": "move on foot",
+            "examples": [
+                {"english_sentence": "We walk.", "korean_sentence": "우리는 걷는다."}
+            ],
+            "writing_practices": [],
+        }
+    ],
+}
+
+
+def snapshot():
+    """Every word row with ids, so any delete or re-insert shows up."""
+    with Session(engine) as session:
+        return {
+            "words": session.exec(select(Word.id, Word.word)).all(),
+            "usages": session.exec(
+                select(
+                    WordUsage.id,
+                    WordUsage.word_id,
+                    WordUsage.usage_type,
+                    WordUsage.description,
+                )
+            ).all(),
+            "examples": session.exec(
+                select(
+                    ExampleSentence.id,
+                    ExampleSentence.word_usage_id,
+                    ExampleSentence.english_sentence,
+                    ExampleSentence.korean_sentence,
+                )
+            ).all(),
+            "practices": session.exec(
+                select(
+                    WritingPractice.id,
+                    WritingPractice.word_usage_id,
+                    WritingPractice.korean_sentence,
+                    WritingPractice.english_answer,
+                )
+            ).all(),
+        }
+
+
+class DeckRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.repository = WordRepository()
+        with engine.begin() as connection:
+            for model in (WritingPractice, ExampleSentence, WordUsage, Word):
+                connection.execute(delete(model))
+
+    def test_export_then_merge_leaves_words_unchanged(self):
+        self.repository.upsert_records([RUN, WALK])
+        before = snapshot()
+        self.assertEqual(len(before["usages"]), 5)
+        self.assertEqual(len(before["examples"]), 5)
+
+        deck = list(transfer.export_deck())
+        self.assertEqual(
+            list(self.repository.iter_records()),
+            list(transfer.read_records(deck)),
+        )
+        self.assertEqual(
+            transfer.import_deck(deck, merge=True),
+            (0, 0),
+        )
+        self.assertEqual(snapshot(), before)
+
+    def test_merge_keeps_rows_of_a_word_split_across_batches(self):
+        self.repository.upsert_records([RUN, WALK])
+        before = snapshot()
+        header, *rows = transfer.export_deck()
+        run_rows = [row for row in rows if row.startswith("run\t")]
+        walk_rows = [row for row in rows if row.startswith("walk\t")]
+        # run's rows on both sides of walk's, one word per transaction.
+        deck = [header, *run_rows[:3], *walk_rows, *run_rows[3:]]
+
+        created, updated = transfer.import_records(
+            transfer.read_records(deck, regroup=True), batch_size=1, merge=True
+        )
+
+        self.assertEqual((created, updated), (0, 0))
+        self.assertEqual(snapshot(), before)
+
+    def test_records_of_the_same_word_in_one_batch_are_combined(self):
+        first = dict(RUN, usages=RUN["usages"][:2])
+        second = dict(RUN, usages=RUN["usages"][2:])
+
+        self.assertEqual(self.repository.upsert_records([first, second]), (1, 0))
+
+        self.assertEqual(list(self.repository.iter_records()), [RUN])